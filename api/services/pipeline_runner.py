@@ -10,7 +10,7 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from .event_manager import EventManager, event_manager
-from src.pipeline_status import mark_processed
+from src.pipeline_status import mark_processed_async
 
 
 @dataclass
@@ -144,7 +144,8 @@ class PipelineRunner:
         from src.db import Track
         from src.config import ENABLE_BATCH_SEGMENTATION, BATCH_SIZE_LLM
         from src.segmenter import segment_lyrics_batch, BatchedSongResult
-        from src.lrc_parser import parse_lrc
+        from src.lrc_parser import parse_lrc_many
+        from src.embedder import unload_model
 
         try:
             # Get tracks
@@ -180,6 +181,11 @@ class PipelineRunner:
             segmentation_cache: dict[int, BatchedSongResult] = {}
 
             if ENABLE_BATCH_SEGMENTATION and tracks:
+                # Phase 1 is LLM-only; free VRAM held by the embedding model
+                # (e.g. loaded by the search/embed routes). Phase 2 reloads it
+                # lazily on the first embed.
+                await asyncio.to_thread(unload_model)
+
                 await self.event_manager.emit("batch_segmentation_started", {
                     "task_id": self.task_id,
                     "total_tracks": len(tracks),
@@ -188,16 +194,21 @@ class PipelineRunner:
 
                 total_batches = (len(tracks) + BATCH_SIZE_LLM - 1) // BATCH_SIZE_LLM
 
+                # Parse all lyrics up front (off the event loop, across cores)
+                parsed_lyrics = await asyncio.to_thread(
+                    parse_lrc_many, [track.synced_lyrics for track in tracks]
+                )
+
                 for batch_num, batch_start in enumerate(range(0, len(tracks), BATCH_SIZE_LLM), 1):
                     if self._stop_requested:
                         break
 
                     batch = tracks[batch_start:batch_start + BATCH_SIZE_LLM]
+                    batch_parsed = parsed_lyrics[batch_start:batch_start + BATCH_SIZE_LLM]
 
-                    # Pre-parse lyrics and filter valid tracks
+                    # Filter valid tracks
                     songs_for_llm: list[tuple[str, str, str, int]] = []
-                    for track in batch:
-                        parsed = parse_lrc(track.synced_lyrics)
+                    for track, parsed in zip(batch, batch_parsed):
                         if parsed.total_lines >= 4:
                             songs_for_llm.append((
                                 parsed.plain_lyrics,
@@ -282,14 +293,14 @@ class PipelineRunner:
                             self.progress.errors.extend(errors)
                             # Mark as failed so it's not retried automatically
                             error_msg = "; ".join(errors)
-                            mark_processed(source, track.id, status="failed", error_message=error_msg)
+                            await mark_processed_async(source, track.id, status="failed", error_message=error_msg)
                             await self.event_manager.emit("track_error", {
                                 "track_id": track.id,
                                 "errors": errors,
                             })
                         else:
                             # Mark as successfully processed
-                            mark_processed(source, track.id, status="success")
+                            await mark_processed_async(source, track.id, status="success")
                             self.progress.processed += 1
                             await self.event_manager.emit("track_complete", {
                                 "track_id": track.id,
@@ -308,7 +319,7 @@ class PipelineRunner:
                     error_msg = f"{track.name}: {str(e)}"
                     self.progress.errors.append(error_msg)
                     # Mark as failed so it's not retried automatically
-                    mark_processed(source, track.id, status="failed", error_message=str(e))
+                    await mark_processed_async(source, track.id, status="failed", error_message=str(e))
                     await self.event_manager.emit("track_error", {
                         "track_id": track.id,
                         "error": str(e),
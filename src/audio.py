@@ -17,6 +17,8 @@ from difflib import SequenceMatcher
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from .config import (
     AUDIO_BITRATE,
     AUDIO_CODEC,
@@ -295,7 +297,8 @@ def download_audio(
                 if not line:
                     continue
                 try:
-                    info = json.loads(line)
+                    # yt-dlp info dicts run to tens of KB per candidate
+                    info = orjson.loads(line)
                     video_duration = info.get("duration", 0)
                     if video_duration == 0:
                         video_duration = expected_duration  # Assume match for scoring
@@ -552,8 +555,8 @@ def log_skipped_song(
         "timestamp": datetime.utcnow().isoformat() + "Z",
     }
 
-    with open(SKIPPED_SONGS_LOG, "a") as f:
-        f.write(json.dumps(entry) + "\n")
+    with open(SKIPPED_SONGS_LOG, "ab") as f:
+        f.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
 
 
 def cleanup_audio_file(file_path: Path) -> None:
@@ -16,6 +16,9 @@ Usage:
 
     # Process curated tracks
     uv run python -m src.cli --source curated --genre afro --test 10
+
+    # Drop cached embeddings (e.g. after changing the embedding model)
+    uv run python -m src.cli --clear-emb-cache
 """
 
 import argparse
@@ -39,7 +42,7 @@ from .curated import (
 from .pipeline_status import clear_processed, get_processed_count, PIPELINE_STATUS_DB
 from .indexer import clear_collection, get_collection_count
 from .config import SNIPPETS_DIR
-from . import logger
+from . import embedding_cache, logger
 
 
 async def cmd_run(args):
@@ -323,8 +326,18 @@ async def main():
         help="Include already-processed tracks (reprocess them)",
     )
 
+    parser.add_argument(
+        "--clear-emb-cache",
+        action="store_true",
+        help="Clear the embedding cache (before the run, if one is requested)",
+    )
+
     args = parser.parse_args()
 
+    if args.clear_emb_cache:
+        cleared = embedding_cache.clear()
+        logger.console.print(f"Cleared {cleared} cached embeddings")
+
     # Handle subcommands
     if args.command == "import-playlist":
         cmd_import_playlist(args)
@@ -339,7 +352,7 @@ async def main():
     elif args.test or args.track_id or args.all:
         # Run main pipeline
         await cmd_run(args)
-    else:
+    elif not args.clear_emb_cache:
         parser.print_help()
 
 
@@ -30,6 +30,12 @@ LOGS_DIR = OUTPUT_DIR / "logs"
 # Skipped songs log
 SKIPPED_SONGS_LOG = OUTPUT_DIR / "skipped_songs.jsonl"
 
+# Embedding cache (reused across runs)
+EMBEDDING_CACHE_PATH = OUTPUT_DIR / "emb_cache.sqlite"
+
+# Single-song LLM segmentation cache (reused across runs)
+SEGMENTATION_CACHE_PATH = OUTPUT_DIR / "seg_cache.sqlite"
+
 
 # ===================
 # LRCLib Query Filters
@@ -75,6 +81,35 @@ LLM_PROVIDERS = ["groq"]
 # LLM_PROVIDERS = ["groq", "together"]
 LLM_MODEL_GROQ = "llama-3.3-70b-versatile"
 LLM_MODEL_TOGETHER = "meta-llama/Meta-Llama-3.1-70B-Instruct-Turbo"
+# With several providers configured, send single-song requests to all of them
+# at once and keep the first good answer (lower latency, more token spend)
+LLM_RACE_PROVIDERS = os.environ.get("LLM_RACE_PROVIDERS", "true").lower() == "true"
+# Head start (seconds) each raced provider gets before the next one is asked;
+# 0 asks them all at once
+LLM_HEDGE_DELAY = float(os.environ.get("LLM_HEDGE_DELAY", 1.5))
+
+# Submit batch segmentation as a Groq Batch API job (discounted, not subject
+# to the per-minute request cap) instead of one inline batched prompt.
+# Jobs not finished within LLM_BATCH_API_MAX_WAIT are cancelled and the
+# batch falls back to the inline prompt.
+LLM_USE_BATCH_API = os.environ.get("LLM_USE_BATCH_API", "false").lower() == "true"
+LLM_BATCH_API_WINDOW = "24h"
+LLM_BATCH_API_POLL_INTERVAL = 30.0  # seconds
+LLM_BATCH_API_MAX_WAIT = float(os.environ.get("LLM_BATCH_API_MAX_WAIT", 3600))
+
+# Tokens-per-minute budget used to pace batch segmentation calls
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", 12000))
+# Prompt + response overhead per song on top of its lyrics (tokens)
+LLM_TOKENS_PER_SONG_OVERHEAD = 400
+# Retry-After waits up to this long are slept through; longer ones stop the run
+LLM_RATE_LIMIT_MAX_WAIT = float(os.environ.get("LLM_RATE_LIMIT_MAX_WAIT", 120))
+
+# Batched call sizing: context window of the model, expected response per
+# song, and a hard cap on max_tokens. Batches whose prompt plus expected
+# response won't fit the context are split in half.
+LLM_CONTEXT_TOKENS = 131072  # llama-3.3-70b-versatile
+LLM_RESPONSE_TOKENS_PER_SONG = 1000
+LLM_MAX_RESPONSE_TOKENS = 15000
 
 
 # ===================
@@ -89,7 +124,20 @@ EMBEDDING_DIMENSION = 768  # Truncated from 1024
 # ===================
 QDRANT_HOST = os.environ.get("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.environ.get("QDRANT_PORT", 6333))
+QDRANT_GRPC_PORT = int(os.environ.get("QDRANT_GRPC_PORT", 6334))
+# gRPC sends vectors/payloads as protobuf instead of JSON over REST
+QDRANT_PREFER_GRPC = os.environ.get("QDRANT_PREFER_GRPC", "true").lower() == "true"
 QDRANT_COLLECTION = "song_snippets"
+# How vectors are stored when the collection is created:
+# "float32" = full precision, "float16" = half-size originals on disk,
+# "int8" = float16 originals plus an int8 quantized copy in RAM for search
+EMBEDDING_PRECISIONS = ("float32", "float16", "int8")
+EMBEDDING_PRECISION = os.environ.get("EMBEDDING_PRECISION", "int8").strip().lower()
+if EMBEDDING_PRECISION not in EMBEDDING_PRECISIONS:
+    raise ValueError(
+        f"EMBEDDING_PRECISION must be one of {', '.join(EMBEDDING_PRECISIONS)}, "
+        f"got {EMBEDDING_PRECISION!r}"
+    )
 
 
 # ===================
@@ -103,14 +151,30 @@ BATCH_SIZE_LLM = 10  # Songs per LLM batch (when batch segmentation enabled)
 BATCH_SIZE_EMBED = 50  # Embeddings per batch
 BATCH_SIZE_INDEX = 100  # Qdrant upserts per batch
 
+# Tracks processed concurrently (download -> embed -> index) while later
+# batches are still being segmented
+TRACK_WORKERS = int(os.environ.get("TRACK_WORKERS", 4))
+
+# Concurrent yt-dlp downloads across in-flight tracks
+DL_WORKERS = int(os.environ.get("DL_WORKERS", 4))
+
+# Segments of one track sliced/uploaded/embedded concurrently
+SEGMENT_CONCURRENCY = int(os.environ.get("SEGMENT_CONCURRENCY", 8))
+
 # Retry settings
 MAX_RETRIES = 3
-RETRY_DELAY = 1.0  # seconds
+RETRY_DELAY = 1.0  # seconds (base of the exponential backoff)
+RETRY_MAX_DELAY = 30.0  # seconds (backoff cap)
 
 
 # ===================
 # Helper Functions
 # ===================
+class MissingAPIKeyError(ValueError):
+    """Raised when a provider's API key is not set in the environment."""
+    pass
+
+
 def get_api_key(provider: str) -> str:
     """
     Get API key for a provider from environment variables.
@@ -122,7 +186,8 @@ def get_api_key(provider: str) -> str:
         API key string
 
     Raises:
-        ValueError: If API key not found in environment
+        ValueError: If the provider is unknown
+        MissingAPIKeyError: If API key not found in environment
     """
     key_map = {
         "groq": "GROQ_API_KEY",
@@ -138,7 +203,7 @@ def get_api_key(provider: str) -> str:
 
     api_key = os.environ.get(env_var)
     if not api_key:
-        raise ValueError(
+        raise MissingAPIKeyError(
             f"{env_var} environment variable not set. "
             f"Please add it to your .env file."
         )
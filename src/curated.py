@@ -17,7 +17,7 @@ from pathlib import Path
 from typing import Generator, Optional
 
 from .lrclib_api import search_lyrics, LRCLibResult
-from .pipeline_status import get_processed_ids
+from .pipeline_status import get_processed_ids_cached
 
 # Default database path
 CURATED_DB_PATH = Path(__file__).parent.parent / "data" / "curated_tracks.sqlite"
@@ -591,7 +591,7 @@ def get_curated_tracks(
         return
 
     # Load processed IDs for filtering (O(1) lookup)
-    processed_ids = get_processed_ids("curated") if exclude_processed else set()
+    processed_ids = get_processed_ids_cached("curated") if exclude_processed else frozenset()
 
     query = """
         SELECT
@@ -9,7 +9,7 @@ from dataclasses import dataclass
 from typing import Generator, Optional
 
 from .config import LRCLIB_DB_PATH, LRCLIB_FILTERS
-from .pipeline_status import get_processed_ids
+from .pipeline_status import get_processed_ids_cached
 
 
 @dataclass
@@ -72,7 +72,7 @@ def get_tracks(
         Track objects with synced lyrics
     """
     # Load processed IDs for filtering (O(1) lookup)
-    processed_ids = get_processed_ids("lrclib") if exclude_processed else set()
+    processed_ids = get_processed_ids_cached("lrclib") if exclude_processed else frozenset()
 
     # Note: No ORDER BY - allows SQLite to return rows as soon as filters match
     # This is much faster with LIMIT since it avoids full table scan + sort
@@ -0,0 +1,88 @@
+"""
+Persistent cache of text embeddings.
+
+Keyed by SHA-256 of (model, dimension, text) so reprocessing a track - or
+an LLM repeating a description - skips the GPU entirely. Stored in SQLite
+(WAL) as raw float32 bytes.
+"""
+
+import hashlib
+
+import numpy as np
+
+from .config import EMBEDDING_CACHE_PATH, EMBEDDING_DIMENSION, EMBEDDING_MODEL
+from .sqlite_cache import CacheDB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key BLOB PRIMARY KEY,
+    vector BLOB NOT NULL
+);
+"""
+
+_db = CacheDB(EMBEDDING_CACHE_PATH, SCHEMA)
+
+
+def make_key(text: str) -> bytes:
+    """
+    Build the cache key for a text under the current model settings.
+
+    Args:
+        text: Text that will be embedded
+
+    Returns:
+        SHA-256 digest
+    """
+    raw = f"{EMBEDDING_MODEL}\x00{EMBEDDING_DIMENSION}\x00{text}"
+    return hashlib.sha256(raw.encode()).digest()
+
+
+def get(text: str) -> np.ndarray | None:
+    """
+    Look up a cached embedding.
+
+    Args:
+        text: Embedded text
+
+    Returns:
+        float32 vector of shape (EMBEDDING_DIMENSION,), or None on miss
+    """
+    with _db.lock:
+        row = _db.conn().execute(
+            "SELECT vector FROM embeddings WHERE key = ?",
+            (make_key(text),),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    return np.frombuffer(row[0], dtype=np.float32)
+
+
+def put(text: str, vector: np.ndarray) -> None:
+    """
+    Store an embedding.
+
+    Args:
+        text: Embedded text
+        vector: Its embedding
+    """
+    blob = np.asarray(vector, dtype=np.float32).tobytes()
+
+    with _db.lock:
+        _db.conn().execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            (make_key(text), blob),
+        )
+
+
+def clear() -> int:
+    """
+    Delete every cached embedding.
+
+    Returns:
+        Number of entries removed
+    """
+    with _db.lock:
+        cursor = _db.conn().execute("DELETE FROM embeddings")
+        return cursor.rowcount
@@ -13,22 +13,48 @@ import uuid
 from dataclasses import dataclass
 from typing import Any, Optional
 
+import numpy as np
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http.models import (
+    Batch,
+    Datatype,
     Distance,
-    PointStruct,
+    FieldCondition,
+    Filter,
+    MatchValue,
+    PayloadSchemaType,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
     VectorParams,
 )
 
 from .config import (
     EMBEDDING_DIMENSION,
+    EMBEDDING_PRECISION,
     QDRANT_COLLECTION,
+    QDRANT_GRPC_PORT,
     QDRANT_HOST,
     QDRANT_PORT,
+    QDRANT_PREFER_GRPC,
 )
 
 
-@dataclass
+# Payload fields used in search filters, indexed at collection creation so
+# filtered searches use an index lookup instead of post-filtering candidates
+PAYLOAD_INDEXES = {
+    "energy": PayloadSchemaType.KEYWORD,
+    "primary_emotion": PayloadSchemaType.KEYWORD,
+    "genre": PayloadSchemaType.KEYWORD,
+    "artist": PayloadSchemaType.KEYWORD,
+    "track_id": PayloadSchemaType.INTEGER,
+}
+
+# Set once ensure_collection has confirmed the collection exists
+_collection_ensured: bool = False
+
+
+@dataclass(slots=True, frozen=True)
 class SnippetPayload:
     """Payload data stored with each vector in Qdrant."""
 
@@ -49,7 +75,12 @@ class SnippetPayload:
     track_id: int  # LRCLib track ID
 
     def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for Qdrant payload."""
+        """
+        Convert to dictionary for Qdrant payload.
+
+        Written out by hand rather than via dataclasses.asdict, which
+        recurses and deep-copies every field.
+        """
         return {
             "snippet_id": self.snippet_id,
             "song_title": self.song_title,
@@ -97,6 +128,9 @@ async def get_client() -> AsyncQdrantClient:
     Get async Qdrant client.
 
     Note: For cloud Qdrant, set QDRANT_API_KEY environment variable.
+
+    Uses gRPC by default (QDRANT_PREFER_GRPC) so upserts skip JSON encoding
+    of payloads and vectors on the REST path.
     """
     import os
 
@@ -106,38 +140,83 @@ async def get_client() -> AsyncQdrantClient:
     if api_key:
         url = os.environ.get("QDRANT_URL")
         if url:
-            return AsyncQdrantClient(url=url, api_key=api_key)
+            return AsyncQdrantClient(
+                url=url,
+                api_key=api_key,
+                prefer_grpc=QDRANT_PREFER_GRPC,
+            )
 
     # Local deployment
-    return AsyncQdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    return AsyncQdrantClient(
+        host=QDRANT_HOST,
+        port=QDRANT_PORT,
+        grpc_port=QDRANT_GRPC_PORT,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+    )
+
+
+async def _create_collection(client: AsyncQdrantClient) -> None:
+    """
+    Create the snippets collection.
+
+    Storage precision follows EMBEDDING_PRECISION. Vectors are unit-norm and
+    only used for cosine search, so by default ("int8") originals are stored
+    as FP16 on disk while an int8 scalar-quantized copy is kept in RAM for
+    search (~4x less memory, negligible recall loss).
+    """
+    quantization_config = None
+    if EMBEDDING_PRECISION == "int8":
+        quantization_config = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            ),
+        )
+
+    await client.create_collection(
+        collection_name=QDRANT_COLLECTION,
+        vectors_config=VectorParams(
+            size=EMBEDDING_DIMENSION,
+            distance=Distance.COSINE,
+            datatype=Datatype.FLOAT32 if EMBEDDING_PRECISION == "float32" else Datatype.FLOAT16,
+            on_disk=True,
+        ),
+        quantization_config=quantization_config,
+    )
+
+    for field_name, field_schema in PAYLOAD_INDEXES.items():
+        await client.create_payload_index(
+            collection_name=QDRANT_COLLECTION,
+            field_name=field_name,
+            field_schema=field_schema,
+        )
 
 
 async def ensure_collection(client: Optional[AsyncQdrantClient] = None) -> bool:
     """
     Ensure the collection exists with correct configuration.
 
-    Creates collection if it doesn't exist.
+    Creates collection if it doesn't exist. The result is remembered for
+    the life of the process, so repeated upserts skip the existence RPC.
 
     Returns:
         True if collection exists or was created successfully
     """
+    global _collection_ensured
+
+    if _collection_ensured:
+        return True
+
     close_client = client is None
     if client is None:
         client = await get_client()
 
     try:
-        collections = await client.get_collections()
-        collection_names = [c.name for c in collections.collections]
-
-        if QDRANT_COLLECTION not in collection_names:
-            await client.create_collection(
-                collection_name=QDRANT_COLLECTION,
-                vectors_config=VectorParams(
-                    size=EMBEDDING_DIMENSION,
-                    distance=Distance.COSINE,
-                ),
-            )
+        if not await client.collection_exists(QDRANT_COLLECTION):
+            await _create_collection(client)
 
+        _collection_ensured = True
         return True
 
     finally:
@@ -152,26 +231,20 @@ async def clear_collection(client: Optional[AsyncQdrantClient] = None) -> bool:
     Returns:
         True if collection was cleared successfully
     """
+    global _collection_ensured
+
     close_client = client is None
     if client is None:
         client = await get_client()
 
     try:
-        collections = await client.get_collections()
-        collection_names = [c.name for c in collections.collections]
-
-        if QDRANT_COLLECTION in collection_names:
+        if await client.collection_exists(QDRANT_COLLECTION):
             await client.delete_collection(collection_name=QDRANT_COLLECTION)
 
         # Recreate empty collection
-        await client.create_collection(
-            collection_name=QDRANT_COLLECTION,
-            vectors_config=VectorParams(
-                size=EMBEDDING_DIMENSION,
-                distance=Distance.COSINE,
-            ),
-        )
+        await _create_collection(client)
 
+        _collection_ensured = True
         return True
 
     finally:
@@ -191,10 +264,7 @@ async def get_collection_count(client: Optional[AsyncQdrantClient] = None) -> in
         client = await get_client()
 
     try:
-        collections = await client.get_collections()
-        collection_names = [c.name for c in collections.collections]
-
-        if QDRANT_COLLECTION not in collection_names:
+        if not await client.collection_exists(QDRANT_COLLECTION):
             return 0
 
         info = await client.get_collection(collection_name=QDRANT_COLLECTION)
@@ -206,7 +276,7 @@ async def get_collection_count(client: Optional[AsyncQdrantClient] = None) -> in
 
 
 async def upsert_snippets(
-    vectors: list[list[float]],
+    vectors: np.ndarray,
     payloads: list[SnippetPayload],
     client: Optional[AsyncQdrantClient] = None,
 ) -> IndexResult:
@@ -214,7 +284,7 @@ async def upsert_snippets(
     Upsert snippet vectors to Qdrant.
 
     Args:
-        vectors: List of embedding vectors (768D each)
+        vectors: Embedding matrix of shape (N, EMBEDDING_DIMENSION)
         payloads: List of SnippetPayload objects (same length as vectors)
         client: Optional existing client (will create one if not provided)
 
@@ -228,7 +298,7 @@ async def upsert_snippets(
             error=f"Vector count ({len(vectors)}) != payload count ({len(payloads)})",
         )
 
-    if not vectors:
+    if len(vectors) == 0:
         return IndexResult(success=True, indexed_count=0)
 
     close_client = client is None
@@ -239,25 +309,24 @@ async def upsert_snippets(
         # Ensure collection exists
         await ensure_collection(client)
 
-        # Build points
-        points = [
-            PointStruct(
-                id=payload.snippet_id,
-                vector=vector,
-                payload=payload.to_dict(),
-            )
-            for vector, payload in zip(vectors, payloads)
-        ]
+        # The client's models validate vectors as lists of floats, so convert
+        # the whole matrix in one C-level tolist() rather than per vector, and
+        # send it column-wise as a Batch instead of building N PointStructs
+        batch = Batch(
+            ids=[payload.snippet_id for payload in payloads],
+            vectors=np.asarray(vectors, dtype=np.float32).tolist(),
+            payloads=[payload.to_dict() for payload in payloads],
+        )
 
         # Upsert to Qdrant
         await client.upsert(
             collection_name=QDRANT_COLLECTION,
-            points=points,
+            points=batch,
         )
 
         return IndexResult(
             success=True,
-            indexed_count=len(points),
+            indexed_count=len(payloads),
         )
 
     except Exception as e:
@@ -303,46 +372,30 @@ async def search_snippets(
         filter_conditions = []
 
         if energy_filter:
-            filter_conditions.append({
-                "key": "energy",
-                "match": {"value": energy_filter},
-            })
+            filter_conditions.append(
+                FieldCondition(key="energy", match=MatchValue(value=energy_filter))
+            )
 
         if emotion_filter:
-            filter_conditions.append({
-                "key": "primary_emotion",
-                "match": {"value": emotion_filter},
-            })
+            filter_conditions.append(
+                FieldCondition(key="primary_emotion", match=MatchValue(value=emotion_filter))
+            )
 
         if genre_filter:
-            filter_conditions.append({
-                "key": "genre",
-                "match": {"value": genre_filter},
-            })
-
-        query_filter = None
-        if filter_conditions:
-            from qdrant_client.http.models import Filter, FieldCondition, MatchValue
-
-            query_filter = Filter(
-                must=[
-                    FieldCondition(key=c["key"], match=MatchValue(value=c["match"]["value"]))
-                    for c in filter_conditions
-                ]
+            filter_conditions.append(
+                FieldCondition(key="genre", match=MatchValue(value=genre_filter))
             )
 
-        # Execute search
-        from qdrant_client.http.models import SearchRequest
+        query_filter = Filter(must=filter_conditions) if filter_conditions else None
 
-        results = await client.search_batch(
+        # Execute search
+        response = await client.query_points(
             collection_name=QDRANT_COLLECTION,
-            requests=[SearchRequest(
-                vector=query_vector,
-                limit=limit,
-                filter=query_filter,
-            )]
+            query=query_vector,
+            limit=limit,
+            query_filter=query_filter,
         )
-        results = results[0] if results else []
+        results = response.points
 
         return [
             SearchResult(
@@ -24,6 +24,10 @@ from rich.table import Table
 # Force terminal mode to prevent buffering issues with async code
 console = Console(force_terminal=True)
 
+# Per-segment lines are buffered and written in one console.print call
+SEGMENT_FLUSH_LINES = 10
+_segment_lines: list[str] = []
+
 
 # Progress bar for overall track processing
 def create_progress() -> Progress:
@@ -49,29 +53,29 @@ def print_header(title: str) -> None:
 def print_step(step: str, detail: str = "") -> None:
     """Print a pipeline step."""
     if detail:
-        console.print(f"  [cyan]→[/cyan] {step}: [dim]{detail}[/dim]")
+        console.print(f"  [cyan]→[/cyan] {step}: [dim]{detail}[/dim]", highlight=False)
     else:
-        console.print(f"  [cyan]→[/cyan] {step}")
+        console.print(f"  [cyan]→[/cyan] {step}", highlight=False)
 
 
 def print_success(message: str) -> None:
     """Print a success message."""
-    console.print(f"  [green]✓[/green] {message}")
+    console.print(f"  [green]✓[/green] {message}", highlight=False)
 
 
 def print_warning(message: str) -> None:
     """Print a warning message."""
-    console.print(f"  [yellow]![/yellow] {message}")
+    console.print(f"  [yellow]![/yellow] {message}", highlight=False)
 
 
 def print_error(message: str) -> None:
     """Print an error message."""
-    console.print(f"  [red]✗[/red] {message}")
+    console.print(f"  [red]✗[/red] {message}", highlight=False)
 
 
 def print_skip(message: str) -> None:
     """Print a skip message."""
-    console.print(f"  [dim]↷ {message}[/dim]")
+    console.print(f"  [dim]↷ {message}[/dim]", highlight=False)
 
 
 def print_track_header(index: int, total: int, artist: str, title: str) -> None:
@@ -90,11 +94,25 @@ def print_segment_info(
     energy: str,
     lines: str,
 ) -> None:
-    """Print info about a segment being processed."""
-    console.print(
+    """
+    Print info about a segment being processed.
+
+    Lines are buffered and flushed every SEGMENT_FLUSH_LINES segments (and
+    on the last segment) so Rich renders once per group instead of per event.
+    """
+    _segment_lines.append(
         f"    [dim]Segment {segment_num}/{total_segments}:[/dim] "
         f"{emotion} ({energy}) - lines {lines}"
     )
+    if segment_num >= total_segments or len(_segment_lines) >= SEGMENT_FLUSH_LINES:
+        flush_segment_info()
+
+
+def flush_segment_info() -> None:
+    """Write any buffered segment lines to the console."""
+    if _segment_lines:
+        console.print("\n".join(_segment_lines), highlight=False)
+        _segment_lines.clear()
 
 
 def print_device_info(device: str, device_name: Optional[str] = None) -> None:
@@ -9,14 +9,20 @@ Example:
     [00:19.52]I go give you
 """
 
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from operator import attrgetter
 
 
 # Regex to match LRC timestamp format: [MM:SS.xx] or [MM:SS]
 LRC_TIMESTAMP_PATTERN = re.compile(r"\[(\d{2}):(\d{2})(?:\.(\d{2,3}))?\]")
 
+# Below this many files, process startup costs more than parsing serially
+PARALLEL_PARSE_MIN_FILES = 64
+PARALLEL_PARSE_CHUNKSIZE = 32
+
 
 @dataclass
 class LyricLine:
@@ -34,6 +40,16 @@ class LyricLine:
         return f"{minutes:02d}:{seconds:05.2f}"
 
 
+@dataclass(slots=True, frozen=True)
+class SegmentResolution:
+    """Outcome of resolving a segment's line range against parsed lyrics."""
+
+    is_valid: bool
+    start_ts: float | None = None  # Seconds, when valid
+    end_ts: float | None = None  # Seconds, when valid
+    error: str | None = None
+
+
 @dataclass
 class ParsedLRC:
     """Parsed LRC data with all lines and helper methods."""
@@ -41,7 +57,7 @@ class ParsedLRC:
     lines: list[LyricLine]
     raw_text: str
 
-    def get_timestamp(self, line_number: int) -> Optional[float]:
+    def get_timestamp(self, line_number: int) -> float | None:
         """
         Get timestamp for a specific line number (1-indexed).
 
@@ -56,7 +72,7 @@ class ParsedLRC:
                 return line.timestamp
         return None
 
-    def get_line(self, line_number: int) -> Optional[LyricLine]:
+    def get_line(self, line_number: int) -> LyricLine | None:
         """Get a specific line by number (1-indexed)."""
         for line in self.lines:
             if line.line_number == line_number:
@@ -67,7 +83,7 @@ class ParsedLRC:
         self,
         start_line: int,
         end_line: int,
-    ) -> tuple[Optional[float], Optional[float]]:
+    ) -> tuple[float | None, float | None]:
         """
         Get start and end timestamps for a segment.
 
@@ -99,6 +115,51 @@ class ParsedLRC:
 
         return start_ts, end_ts
 
+    def resolve_segment(self, start_line: int, end_line: int) -> SegmentResolution:
+        """
+        Validate a segment's line range and look up its timestamps in one step.
+
+        Same rules as validate_segment_lines() and get_segment_timestamps(),
+        but lines are numbered 1..N in order, so both ends are indexed
+        directly instead of scanning the line list.
+
+        Args:
+            start_line: Starting line number (1-indexed, inclusive)
+            end_line: Ending line number (1-indexed, inclusive)
+
+        Returns:
+            SegmentResolution with timestamps, or an error message
+        """
+        total = len(self.lines)
+
+        if start_line < 1:
+            return SegmentResolution(False, error=f"start_line must be >= 1, got {start_line}")
+
+        if end_line < start_line:
+            return SegmentResolution(
+                False, error=f"end_line ({end_line}) must be >= start_line ({start_line})"
+            )
+
+        if start_line > total:
+            return SegmentResolution(
+                False, error=f"start_line ({start_line}) exceeds total lines ({total})"
+            )
+
+        if end_line > total:
+            return SegmentResolution(
+                False, error=f"end_line ({end_line}) exceeds total lines ({total})"
+            )
+
+        start_ts = self.lines[start_line - 1].timestamp
+
+        # End at the start of the next line, or pad the last line by 3 seconds
+        if end_line < total:
+            end_ts = self.lines[end_line].timestamp
+        else:
+            end_ts = self.lines[end_line - 1].timestamp + 3.0
+
+        return SegmentResolution(True, start_ts=start_ts, end_ts=end_ts)
+
     def get_lyrics_text(self, start_line: int, end_line: int) -> str:
         """
         Get combined lyrics text for a range of lines.
@@ -179,6 +240,8 @@ def parse_lrc(synced_lyrics: str) -> ParsedLRC:
     """
     lines = []
     line_number = 0
+    prev_timestamp = -1.0
+    needs_sort = False
 
     for raw_line in synced_lyrics.split("\n"):
         raw_line = raw_line.strip()
@@ -205,22 +268,51 @@ def parse_lrc(synced_lyrics: str) -> ParsedLRC:
         timestamp = parse_timestamp(matches[0])
         line_number += 1
 
+        if timestamp < prev_timestamp:
+            needs_sort = True
+        prev_timestamp = timestamp
+
         lines.append(LyricLine(
             line_number=line_number,
             timestamp=timestamp,
             text=text,
         ))
 
-    # Sort by timestamp (should already be sorted, but just in case)
-    lines.sort(key=lambda x: x.timestamp)
+    # LRCLib files are almost always in order - only sort (and re-number)
+    # when a timestamp went backwards
+    if needs_sort:
+        lines.sort(key=attrgetter("timestamp"))
 
-    # Re-number after sorting
-    for i, line in enumerate(lines):
-        line.line_number = i + 1
+        for i, line in enumerate(lines):
+            line.line_number = i + 1
 
     return ParsedLRC(lines=lines, raw_text=synced_lyrics)
 
 
+def parse_lrc_many(
+    synced_lyrics_list: list[str],
+    max_workers: int | None = None,
+) -> list[ParsedLRC]:
+    """
+    Parse many LRC files, spreading the work across CPU cores.
+
+    parse_lrc is pure-Python regex work, so a process pool sidesteps the
+    GIL. Small inputs are parsed in-process.
+
+    Args:
+        synced_lyrics_list: Raw LRC format strings
+        max_workers: Worker processes (defaults to os.cpu_count())
+
+    Returns:
+        ParsedLRC objects in same order as input
+    """
+    if len(synced_lyrics_list) < PARALLEL_PARSE_MIN_FILES:
+        return [parse_lrc(text) for text in synced_lyrics_list]
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        return list(pool.map(parse_lrc, synced_lyrics_list, chunksize=PARALLEL_PARSE_CHUNKSIZE))
+
+
 def validate_segment_lines(
     parsed_lrc: ParsedLRC,
     start_line: int,
@@ -4,141 +4,527 @@ LRCLib API client for fetching synced lyrics.
 API Documentation: https://lrclib.net/docs
 """
 
+import atexit
 import httpx
-from dataclasses import dataclass
-from typing import Optional
+import itertools
+import orjson
+import random
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, Optional
 import time
 
+from . import lrclib_cache
+
 LRCLIB_API_BASE = "https://lrclib.net/api"
 
 # Rate limiting - be respectful to the API
-REQUEST_DELAY = 0.5  # seconds between requests
+REQUEST_RATE = 2.0  # sustained requests per second
+REQUEST_RATE_MIN = 0.25  # floor when backing off after 429s
+REQUEST_BURST = 4  # requests allowed back-to-back after an idle period
+
+# Retry transient failures (network errors, 429, 5xx) with capped exponential backoff
+MAX_RETRIES = 4
+RETRY_BASE_DELAY = 0.25  # seconds, doubled per attempt
+RETRY_MAX_DELAY = 8.0
+RETRY_AFTER_MAX = 60.0  # cap on server-provided Retry-After
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# Featuring artist at the end of a title: "ft.", "feat." or "featuring",
+# either bare ("Song ft. X") or parenthesized ("Song (feat. X)")
+_FEAT_RE = re.compile(
+    r"\s*\((?:ft\.|feat\.|featuring)\s+(?P<paren>.+)\)$"
+    r"|\s+(?:ft\.|feat\.|featuring)\s+(?P<bare>.+)$",
+    re.IGNORECASE,
+)
+
+# /api/search candidates further than this from the expected duration are
+# rejected (the same tolerance /api/get applies to its duration parameter)
+SEARCH_MAX_DURATION_DRIFT = 2.0  # seconds
+
+# Runs of whitespace, collapsed to one space by _normalize
+_WS_RE = re.compile(r"\s+")
+
+# Typographic quotes mapped to their ASCII forms by _normalize
+_QUOTE_TABLE = str.maketrans({
+    "\u2018": "'",
+    "\u2019": "'",
+    "\u201c": '"',
+    "\u201d": '"',
+})
+
+# Shared client so lookups reuse one pooled (HTTP/2) connection to lrclib.net
+# instead of paying a TCP + TLS handshake per request
+_CLIENT = httpx.Client(
+    base_url=LRCLIB_API_BASE,
+    timeout=10.0,
+    limits=httpx.Limits(
+        max_keepalive_connections=8,
+        max_connections=16,
+        keepalive_expiry=30.0,
+    ),
+    headers={
+        "User-Agent": "orin-pipeline/1.0",
+        # Brotli roughly halves JSON search payloads vs gzip (decoded by
+        # httpx via the brotli extra)
+        "Accept-Encoding": "br, gzip",
+    },
+    http2=True,
+)
+atexit.register(_CLIENT.close)
+
+# Worker threads for concurrent /api/get probes, reused across lookups.
+# httpx.Client is thread-safe and the threads share _BUCKET's rate budget.
+PROBE_WORKERS = 4
+_POOL = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="lrclib-probe")
+atexit.register(_POOL.shutdown, wait=False, cancel_futures=True)
+
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    requests only wait when the short-term rate would exceed the budget.
+    The rate adapts: halved on HTTP 429, nudged back up on success.
+    """
+
+    def __init__(self, rate: float, capacity: int, min_rate: float = REQUEST_RATE_MIN):
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if none are available.
+
+        Returns:
+            Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.rate)
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    def decrease_rate(self) -> None:
+        """Back off after the server signalled overload."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def increase_rate(self) -> None:
+        """Recover towards the configured rate after a success."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+_BUCKET = TokenBucket(rate=REQUEST_RATE, capacity=REQUEST_BURST)
+
+
+def _retry_after(response: httpx.Response) -> float:
+    """Seconds requested by a Retry-After header (0 if absent or not numeric)."""
+    try:
+        return min(RETRY_AFTER_MAX, float(response.headers.get("Retry-After", 0)))
+    except ValueError:
+        return 0.0
+
+
+def _send(
+    path: str,
+    params: dict | None,
+    headers: dict | None = None,
+) -> httpx.Response:
+    """Single rate-limited GET, feeding the response status back to the bucket."""
+    _BUCKET.acquire()
+    response = _CLIENT.get(path, params=params, headers=headers)
+
+    if response.status_code == 429:
+        _BUCKET.decrease_rate()
+    elif response.status_code < 500:
+        _BUCKET.increase_rate()
+
+    return response
+
+
+def _http_get(
+    path: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    max_retries: int = MAX_RETRIES,
+) -> httpx.Response:
+    """
+    Rate-limited GET against the LRCLib API, retrying transient failures.
+
+    Network errors, 429 and 5xx responses are retried with capped
+    exponential backoff plus jitter (honoring Retry-After on 429). Any
+    other response - including 404 - is returned immediately.
+
+    Args:
+        path: Path relative to LRCLIB_API_BASE
+        params: Query parameters
+        headers: Extra request headers
+        max_retries: Retries after the first attempt
+
+    Returns:
+        httpx.Response (the last one if retries are exhausted)
+
+    Raises:
+        httpx.RequestError: On network failure of the final attempt
+    """
+    for attempt in range(max_retries):
+        try:
+            response = _send(path, params, headers)
+        except httpx.RequestError:
+            response = None
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                return response
+
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt) + random.uniform(0, 0.1)
+        if response is not None and response.status_code == 429:
+            delay = max(delay, _retry_after(response))
+        time.sleep(delay)
 
+    return _send(path, params, headers)
 
-@dataclass
+
+# Required fields of an LRCLib track object, extracted in one call
+_TRACK_FIELDS = itemgetter("id", "trackName", "artistName", "duration")
+
+
+@dataclass(slots=True, frozen=True)
 class LRCLibResult:
     """Result from LRCLib API."""
 
     id: int
     track_name: str
     artist_name: str
-    album_name: Optional[str]
+    album_name: str | None
     duration: float
     synced_lyrics: str
 
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> Optional["LRCLibResult"]:
+        """
+        Build a result from an LRCLib track object.
+
+        Args:
+            data: Track object from /api/get or /api/search
+
+        Returns:
+            LRCLibResult, or None if the track has no synced lyrics
+        """
+        synced = data.get("syncedLyrics")
+        if not synced:
+            return None
+
+        track_id, track_name, artist_name, duration = _TRACK_FIELDS(data)
+        return cls(
+            id=track_id,
+            track_name=track_name,
+            artist_name=artist_name,
+            album_name=data.get("albumName"),
+            duration=duration,
+            synced_lyrics=synced,
+        )
+
 
 def search_lyrics(
     artist: str,
     title: str,
-    duration: Optional[float] = None,
-) -> Optional[LRCLibResult]:
+    duration: float | None = None,
+    force_refresh: bool = False,
+) -> LRCLibResult | None:
     """
     Search LRCLib API for synced lyrics.
 
     Tries multiple strategies:
-    1. /api/get with exact match (artist, title variations, duration)
-    2. /api/get without duration (title variations)
-    3. /api/search with fuzzy query
+    1. /api/search by artist + base title, matched locally against title variations
+    2. /api/get with exact match (artist, title variations, duration)
+    3. /api/get without duration (title variations)
+    4. /api/search with fuzzy query
+
+    Results are cached, see lrclib_cache. Misses are cached for a few
+    hours so tracks without lyrics don't re-run every strategy each time.
 
     Args:
         artist: Artist name
         title: Song title
         duration: Song duration in seconds (optional, improves matching)
+        force_refresh: Ignore a cached miss and query the API again (e.g.
+            when the LRCLib catalog may have gained the track)
 
     Returns:
         LRCLibResult if synced lyrics found, None otherwise
     """
+    # Normalize once so equivalent spellings share a cache entry and the
+    # API sees clean input
+    artist, title = _normalize(artist), _normalize(title)
+
+    key = lrclib_cache.make_key(artist, title, duration)
+
+    cached = lrclib_cache.get(key)
+    if cached is not None:
+        if cached.hit:
+            return LRCLibResult(**cached.result)
+        if not force_refresh:
+            return None
+
+    result = _search_lyrics_uncached(artist, title, duration)
+    lrclib_cache.put(key, asdict(result) if result else None)
+
+    return result
+
+
+def _normalize(text: str) -> str:
+    """
+    Canonicalize an artist or title string.
+
+    Applies NFKC (full-width and compatibility forms), maps typographic
+    quotes to ASCII and collapses whitespace.
+
+    Args:
+        text: Raw artist or title
+
+    Returns:
+        Normalized string
+    """
+    text = unicodedata.normalize("NFKC", text).translate(_QUOTE_TABLE)
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _search_lyrics_uncached(
+    artist: str,
+    title: str,
+    duration: float | None = None,
+) -> LRCLibResult | None:
+    """Run the search strategies against the LRCLib API (no cache)."""
     # Generate title variations to handle different featuring artist formats
     # e.g., "Bad Vibes ft. X" -> ["Bad Vibes ft. X", "Bad Vibes (feat. X)", "Bad Vibes feat. X", "Bad Vibes"]
     title_variations = _generate_title_variations(title)
 
-    # Strategy 1: Exact match with duration
-    if duration:
-        for variant in title_variations:
-            result = _get_exact(artist, variant, int(duration))
-            if result:
-                return result
+    # Exact /api/get probes: with duration first (if known), then without
+    probe_durations = (int(duration), None) if duration else (None,)
 
-    # Strategy 2: Exact match without duration
-    for variant in title_variations:
-        result = _get_exact(artist, variant)
-        if result:
-            return result
+    # Strategies in priority order, evaluated lazily - next() stops at the
+    # first one that finds synced lyrics
+    strategies = itertools.chain(
+        (partial(_search_by_fields, artist, title, title_variations, duration),),
+        (partial(_probe_variations, artist, title_variations, d) for d in probe_durations),
+        (partial(_search_fuzzy, artist, title, duration),),
+    )
 
-    # Strategy 3: Fuzzy search
-    result = _search_fuzzy(artist, title, duration)
-    if result:
-        return result
+    return next(filter(None, (strategy() for strategy in strategies)), None)
 
-    return None
+
+def _base_title(title: str) -> str:
+    """Title with any trailing featuring-artist suffix removed."""
+    match = _FEAT_RE.search(title)
+    return title[:match.start()].strip() if match else title
 
 
-def _generate_title_variations(title: str) -> list[str]:
+@lru_cache(maxsize=4096)
+def _generate_title_variations(title: str) -> tuple[str, ...]:
     """
     Generate title variations to handle different featuring artist formats.
 
+    Memoized per title; returns a tuple so the cached value can't be mutated.
+
     Examples:
-        "Bad Vibes ft. Artist" -> [
+        "Bad Vibes ft. Artist" -> (
             "Bad Vibes ft. Artist",
             "Bad Vibes (feat. Artist)",
             "Bad Vibes feat. Artist",
             "Bad Vibes (ft. Artist)",
             "Bad Vibes",
-        ]
+        )
 
     Args:
         title: Original title
 
     Returns:
-        List of title variations to try
+        Tuple of title variations to try
     """
-    import re
-
     variations = [title]  # Always try the original first
 
     # Check if title has featuring artist in various formats
-    # Patterns: "ft.", "feat.", "featuring", with/without parentheses
-    patterns = [
-        (r'\s+ft\.\s+(.+)$', 'ft.'),
-        (r'\s+feat\.\s+(.+)$', 'feat.'),
-        (r'\s+featuring\s+(.+)$', 'featuring'),
-        (r'\s*\(ft\.\s+(.+)\)$', 'ft.'),
-        (r'\s*\(feat\.\s+(.+)\)$', 'feat.'),
-        (r'\s*\(featuring\s+(.+)\)$', 'featuring'),
+    match = _FEAT_RE.search(title)
+    if match:
+        featured_artist = match.group("paren") or match.group("bare")
+        base_title = title[:match.start()].strip()
+
+        # Generate variations
+        variations.extend([
+            f"{base_title} (feat. {featured_artist})",
+            f"{base_title} feat. {featured_artist}",
+            f"{base_title} ft. {featured_artist}",
+            f"{base_title} (ft. {featured_artist})",
+            base_title,  # Try without featuring artist
+        ])
+
+    # Remove duplicates while preserving order
+    return tuple(dict.fromkeys(variations))
+
+
+def _search_by_fields(
+    artist: str,
+    title: str,
+    title_variations: tuple[str, ...],
+    duration: float | None = None,
+) -> LRCLibResult | None:
+    """One /api/search field query covering every title variation."""
+    candidates = _search_candidates(artist, _base_title(title))
+    return _match_candidates(candidates, artist, title_variations, duration)
+
+
+def _search_candidates(artist: str, title: str) -> list[dict[str, Any]]:
+    """
+    Fetch candidate tracks via /api/search by artist and track name fields.
+
+    Args:
+        artist: Artist name
+        title: Track name (base title, without featuring artist)
+
+    Returns:
+        Raw track objects (empty on error or no results)
+    """
+    try:
+        response = _http_get(
+            "/search",
+            params={"track_name": title, "artist_name": artist},
+        )
+
+        if response.status_code != 200:
+            return []
+
+        return orjson.loads(response.content) or []
+
+    except (httpx.RequestError, orjson.JSONDecodeError):
+        return []
+
+
+def _artist_key(artist: str) -> str:
+    """Normalized, lowercased artist with any featuring-artist suffix removed."""
+    return _base_title(_normalize(artist)).lower()
+
+
+def _match_candidates(
+    candidates: list[dict[str, Any]],
+    artist: str,
+    title_variations: tuple[str, ...],
+    duration: float | None = None,
+) -> LRCLibResult | None:
+    """
+    Pick the best search candidate for the artist and one of the title variations.
+
+    The artist_name filter on /api/search is fuzzy, so candidates must also
+    have an artist name equal (case-insensitive, featuring artists ignored)
+    to the requested one - otherwise covers, karaoke and tribute uploads of
+    the same title would match. They also need synced lyrics, a track name
+    equal (case-insensitive) to a variation and, with a duration, to be
+    within SEARCH_MAX_DURATION_DRIFT of it. The closest duration wins; ties
+    (and the no-duration case) go to the earliest variation.
+
+    Args:
+        candidates: Raw track objects from _search_candidates()
+        artist: Requested artist name
+        title_variations: Titles to accept, most preferred first
+        duration: Expected duration in seconds (optional)
+
+    Returns:
+        LRCLibResult for the best match, None if no candidate matches
+    """
+    rank: dict[str, int] = {}
+    for i, variant in enumerate(title_variations):
+        rank.setdefault(variant.lower(), i)
+
+    artist_key = _artist_key(artist)
+
+    matches = [
+        c for c in candidates
+        if c.get("syncedLyrics")
+        and (c.get("trackName") or "").lower() in rank
+        and _artist_key(c.get("artistName") or "") == artist_key
+        and (
+            not duration
+            or abs((c.get("duration") or 0) - duration) <= SEARCH_MAX_DURATION_DRIFT
+        )
     ]
+    if not matches:
+        return None
 
-    for pattern, _ in patterns:
-        match = re.search(pattern, title, re.IGNORECASE)
-        if match:
-            featured_artist = match.group(1)
-            base_title = title[:match.start()].strip()
-
-            # Generate variations
-            variations.extend([
-                f"{base_title} (feat. {featured_artist})",
-                f"{base_title} feat. {featured_artist}",
-                f"{base_title} ft. {featured_artist}",
-                f"{base_title} (ft. {featured_artist})",
-                base_title,  # Try without featuring artist
-            ])
-            break
+    if duration:
+        best = min(
+            matches,
+            key=lambda c: (
+                abs((c.get("duration") or 0) - duration),
+                rank[c["trackName"].lower()],
+            ),
+        )
+    else:
+        best = min(matches, key=lambda c: rank[c["trackName"].lower()])
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_variations = []
-    for v in variations:
-        if v not in seen:
-            seen.add(v)
-            unique_variations.append(v)
+    return LRCLibResult.from_json(best)
 
-    return unique_variations
+
+def _probe_variations(
+    artist: str,
+    title_variations: tuple[str, ...],
+    duration: int | None = None,
+) -> LRCLibResult | None:
+    """
+    Probe /api/get for every title variation concurrently.
+
+    Up to PROBE_WORKERS probes are in flight at once, multiplexed over the
+    shared HTTP/2 connection, so a strategy costs ~ceil(N / PROBE_WORKERS)
+    round trips instead of N (subject to the rate limiter). The earliest
+    variation (in list order) with synced lyrics wins; probes for later
+    variations that haven't started are cancelled once it resolves.
+
+    Args:
+        artist: Artist name
+        title_variations: Titles to try, most preferred first
+        duration: Duration in seconds (optional)
+
+    Returns:
+        LRCLibResult for the most preferred matching variation, None otherwise
+    """
+    futures = [
+        _POOL.submit(_get_exact, artist, variant, duration)
+        for variant in title_variations
+    ]
+
+    for i, future in enumerate(futures):
+        result = future.result()
+        if result:
+            for pending in futures[i + 1:]:
+                pending.cancel()
+            return result
+
+    return None
 
 
 def _get_exact(
     artist: str,
     title: str,
-    duration: Optional[int] = None,
-) -> Optional[LRCLibResult]:
+    duration: int | None = None,
+) -> LRCLibResult | None:
     """
     Try exact match via /api/get endpoint.
 
@@ -158,26 +544,11 @@ def _get_exact(
         params["duration"] = duration
 
     try:
-        time.sleep(REQUEST_DELAY)
-        response = httpx.get(
-            f"{LRCLIB_API_BASE}/get",
-            params=params,
-            timeout=10,
-        )
+        response = _http_get("/get", params=params)
 
         if response.status_code == 200:
-            data = response.json()
-            synced = data.get("syncedLyrics")
-            if synced:
-                return LRCLibResult(
-                    id=data["id"],
-                    track_name=data["trackName"],
-                    artist_name=data["artistName"],
-                    album_name=data.get("albumName"),
-                    duration=data["duration"],
-                    synced_lyrics=synced,
-                )
-    except httpx.RequestError:
+            return LRCLibResult.from_json(orjson.loads(response.content))
+    except (httpx.RequestError, orjson.JSONDecodeError):
         pass
 
     return None
@@ -186,8 +557,8 @@ def _get_exact(
 def _search_fuzzy(
     artist: str,
     title: str,
-    expected_duration: Optional[float] = None,
-) -> Optional[LRCLibResult]:
+    expected_duration: float | None = None,
+) -> LRCLibResult | None:
     """
     Fuzzy search via /api/search endpoint.
 
@@ -202,17 +573,12 @@ def _search_fuzzy(
     query = f"{artist} {title}"
 
     try:
-        time.sleep(REQUEST_DELAY)
-        response = httpx.get(
-            f"{LRCLIB_API_BASE}/search",
-            params={"q": query},
-            timeout=10,
-        )
+        response = _http_get("/search", params={"q": query})
 
         if response.status_code != 200:
             return None
 
-        results = response.json()
+        results = orjson.loads(response.content)
         if not results:
             return None
 
@@ -221,57 +587,62 @@ def _search_fuzzy(
         if not synced_results:
             return None
 
-        # If we have expected duration, prefer closest match
+        # If we have expected duration, prefer closest match (min keeps the
+        # earliest result on ties, same as a stable sort + [0])
+        best = synced_results[0]
         if expected_duration:
-            synced_results.sort(
-                key=lambda r: abs(r.get("duration", 0) - expected_duration)
+            best = min(
+                synced_results,
+                key=lambda r: abs(r.get("duration", 0) - expected_duration),
             )
 
-        # Return first (best) match
-        best = synced_results[0]
-        return LRCLibResult(
-            id=best["id"],
-            track_name=best["trackName"],
-            artist_name=best["artistName"],
-            album_name=best.get("albumName"),
-            duration=best["duration"],
-            synced_lyrics=best["syncedLyrics"],
-        )
+        return LRCLibResult.from_json(best)
 
-    except httpx.RequestError:
+    except (httpx.RequestError, orjson.JSONDecodeError):
         return None
 
 
-def get_lyrics_by_id(lrclib_id: int) -> Optional[LRCLibResult]:
+def get_lyrics_by_id(lrclib_id: int) -> LRCLibResult | None:
     """
     Get lyrics by LRCLib ID.
 
+    A previously fetched record is revalidated with If-None-Match /
+    If-Modified-Since; on 304 the cached copy is returned without
+    re-downloading the lyrics.
+
     Args:
         lrclib_id: LRCLib track ID
 
     Returns:
         LRCLibResult if found, None otherwise
     """
+    key = lrclib_cache.make_id_key(lrclib_id)
+    cached = lrclib_cache.get(key)
+
+    headers = {}
+    if cached is not None and cached.hit:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
     try:
-        time.sleep(REQUEST_DELAY)
-        response = httpx.get(
-            f"{LRCLIB_API_BASE}/get/{lrclib_id}",
-            timeout=10,
-        )
+        response = _http_get(f"/get/{lrclib_id}", headers=headers or None)
+
+        if response.status_code == 304 and headers:
+            return LRCLibResult(**cached.result)
 
         if response.status_code == 200:
-            data = response.json()
-            synced = data.get("syncedLyrics")
-            if synced:
-                return LRCLibResult(
-                    id=data["id"],
-                    track_name=data["trackName"],
-                    artist_name=data["artistName"],
-                    album_name=data.get("albumName"),
-                    duration=data["duration"],
-                    synced_lyrics=synced,
+            result = LRCLibResult.from_json(orjson.loads(response.content))
+            if result:
+                lrclib_cache.put(
+                    key,
+                    asdict(result),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
                 )
-    except httpx.RequestError:
+            return result
+    except (httpx.RequestError, orjson.JSONDecodeError):
         pass
 
     return None
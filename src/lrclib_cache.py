@@ -0,0 +1,179 @@
+"""
+Response cache for LRCLib API lookups.
+
+Two tiers keyed by normalized (artist, title, duration):
+- In-process LRU for repeated lookups within a run
+- SQLite (WAL) on disk so lookups survive restarts
+
+Misses are cached too, with a shorter TTL, so tracks LRCLib doesn't have
+aren't re-queried on every run.
+"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .sqlite_cache import CacheDB
+
+# Database path
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / "data"
+LRCLIB_CACHE_DB = DATA_DIR / "lrclib_cache.sqlite"
+
+# How long a "not found" stays cached before LRCLib is asked again
+NEGATIVE_TTL_SECONDS = 6 * 60 * 60
+
+# Entries kept in the in-process tier
+MEMORY_CACHE_SIZE = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lrclib (
+    key TEXT PRIMARY KEY,
+    hit INTEGER NOT NULL,
+    result TEXT,
+    ts INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT
+);
+"""
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached lookup outcome."""
+
+    hit: bool  # False = LRCLib had no synced lyrics
+    result: dict[str, Any] | None  # LRCLibResult fields when hit
+    ts: int  # Unix time the entry was stored
+    etag: str | None = None  # ETag of the response, for revalidation
+    last_modified: str | None = None  # Last-Modified of the response
+
+
+_db = CacheDB(LRCLIB_CACHE_DB, SCHEMA)
+_memory: OrderedDict[str, CacheEntry] = OrderedDict()
+
+
+def make_key(artist: str, title: str, duration: float | None = None) -> str:
+    """
+    Build the cache key for a lookup.
+
+    Args:
+        artist: Artist name
+        title: Song title
+        duration: Song duration in seconds (optional)
+
+    Returns:
+        Hex digest of the normalized lookup
+    """
+    raw = f"{artist.lower().strip()}|{title.lower().strip()}|{int(duration or 0)}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def make_id_key(lrclib_id: int) -> str:
+    """
+    Build the cache key for a lookup by LRCLib ID.
+
+    Args:
+        lrclib_id: LRCLib track ID
+
+    Returns:
+        Hex digest (distinct from any make_key() digest)
+    """
+    return hashlib.blake2b(f"id|{lrclib_id}".encode(), digest_size=16).hexdigest()
+
+
+def _is_fresh(entry: CacheEntry) -> bool:
+    """Hits never expire; misses expire after NEGATIVE_TTL_SECONDS."""
+    return entry.hit or time.time() - entry.ts < NEGATIVE_TTL_SECONDS
+
+
+def _remember(key: str, entry: CacheEntry) -> None:
+    """Store in the in-process tier (caller holds _db.lock)."""
+    _memory[key] = entry
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def get(key: str) -> CacheEntry | None:
+    """
+    Look up a cached result.
+
+    Args:
+        key: Key from make_key() or make_id_key()
+
+    Returns:
+        CacheEntry if a fresh entry exists, None on cache miss
+    """
+    with _db.lock:
+        entry = _memory.get(key)
+
+        if entry is None:
+            row = _db.conn().execute(
+                "SELECT hit, result, ts, etag, last_modified FROM lrclib WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            hit, result, ts, etag, last_modified = row
+            entry = CacheEntry(
+                hit=bool(hit),
+                result=json.loads(result) if result else None,
+                ts=ts,
+                etag=etag,
+                last_modified=last_modified,
+            )
+
+        if not _is_fresh(entry):
+            _memory.pop(key, None)
+            return None
+
+        _remember(key, entry)
+        return entry
+
+
+def put(
+    key: str,
+    result: dict[str, Any] | None,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> None:
+    """
+    Store a lookup outcome.
+
+    Args:
+        key: Key from make_key() or make_id_key()
+        result: LRCLibResult fields, or None to cache a miss
+        etag: ETag header of the response (optional)
+        last_modified: Last-Modified header of the response (optional)
+    """
+    entry = CacheEntry(
+        hit=result is not None,
+        result=result,
+        ts=int(time.time()),
+        etag=etag,
+        last_modified=last_modified,
+    )
+
+    with _db.lock:
+        _db.conn().execute(
+            """
+            INSERT OR REPLACE INTO lrclib (key, hit, result, ts, etag, last_modified)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                key,
+                int(entry.hit),
+                json.dumps(result) if result else None,
+                entry.ts,
+                etag,
+                last_modified,
+            ),
+        )
+        _remember(key, entry)
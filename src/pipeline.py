@@ -15,14 +15,23 @@ Coordinates the full processing flow:
 Entry point loads .env before importing this module.
 """
 
-import json
+import asyncio
+import os
 import sys
+from collections.abc import AsyncIterator, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Optional
+from time import time_ns
+from typing import BinaryIO, cast
+
+import numpy as np
+import orjson
 
 from .audio import (
+    DownloadResult,
     check_version_match,
     cleanup_audio_file,
     download_audio,
@@ -31,33 +40,173 @@ from .audio import (
 )
 from .config import (
     BATCH_SIZE_LLM,
+    DL_WORKERS,
     DURATION_TOLERANCE,
+    EMBEDDING_DIMENSION,
     ENABLE_BATCH_SEGMENTATION,
     LLM_PROVIDERS,
+    LLM_RATE_LIMIT_MAX_WAIT,
+    LLM_TOKENS_PER_MINUTE,
+    LLM_TOKENS_PER_SONG_OVERHEAD,
     OUTPUT_DIR,
     QDRANT_HOST,
+    SEGMENT_CONCURRENCY,
+    TRACK_WORKERS,
     ensure_directories,
 )
-from .db import Track, get_track_by_id, get_tracks
+from .db import Track, get_track_by_id, get_track_count, get_tracks
 from .curated import get_curated_tracks, get_curated_track_count, CURATED_DB_PATH
-from .embedder import embed_text, get_device_info, unload_model
+from .embedder import embed_texts_cached, get_device_info, unload_model
 from .indexer import (
     SnippetPayload,
     generate_snippet_id,
     upsert_snippets,
 )
-from .lrc_parser import parse_lrc, validate_segment_lines
-from .pipeline_status import mark_processed
+from .lrc_parser import ParsedLRC, parse_lrc, parse_lrc_many
+from .pipeline_status import (
+    enqueue_processed,
+    flush_processed,
+    get_processed_count,
+    is_processed_async,
+)
+from .ratelimit import CostBucket, estimate_tokens
 from .segmenter import (
     BatchedSongResult,
+    Segment,
+    close_clients,
     segment_lyrics,
     segment_lyrics_batch,
     validate_segments,
 )
-from .storage import is_r2_configured, upload_snippet
+from .storage import close_s3, is_r2_configured, upload_snippet
 from . import logger
 
 
+# yt-dlp and ffmpeg block, so they run off the event loop: downloads are
+# network-bound (sized by DL_WORKERS), slicing is CPU-bound (one per core)
+_DL_POOL = ThreadPoolExecutor(max_workers=DL_WORKERS, thread_name_prefix="download")
+_FFMPEG_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="ffmpeg")
+
+# Segment listings longer than this are thinned to every Nth segment
+SEGMENT_LOG_FULL_MAX = 20
+SEGMENT_LOG_EVERY = 5
+
+
+class _NullLogger:
+    """Stand-in for the logger module when verbose is off; every print_* is a no-op."""
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        return _noop
+
+
+def _noop(*args: object, **kwargs: object) -> None:
+    pass
+
+
+_NULL_LOGGER = _NullLogger()
+
+# In-run download dedupe: tracks that resolve to the same song (re-releases,
+# compilations) share one downloaded file. Entries live until the last track
+# using the file releases it.
+_DL_CACHE: dict[tuple[str, str, int], DownloadResult] = {}
+_DL_REFS: dict[tuple[str, str, int], int] = {}
+_DL_LOCKS: dict[tuple[str, str, int], asyncio.Lock] = {}
+_DL_LOCK_USERS: dict[tuple[str, str, int], int] = {}  # Tasks holding/awaiting each lock
+_DL_KEYS: dict[Path, tuple[str, str, int]] = {}
+
+
+def _download_key(track: Track) -> tuple[str, str, int]:
+    """Key identifying the audio a track downloads."""
+    return (
+        " ".join(track.name.lower().split()),
+        " ".join(track.artist_name.lower().split()),
+        round(track.duration),
+    )
+
+
+async def _acquire_audio(track: Track) -> DownloadResult:
+    """
+    Download a track's audio, or reuse a download already held by the run.
+
+    Every successful result must be handed back with _release_audio().
+
+    Args:
+        track: Track to download audio for
+
+    Returns:
+        DownloadResult (failures are not cached)
+    """
+    key = _download_key(track)
+    lock = _DL_LOCKS.get(key)
+    if lock is None:
+        lock = _DL_LOCKS[key] = asyncio.Lock()
+    _DL_LOCK_USERS[key] = _DL_LOCK_USERS.get(key, 0) + 1
+
+    try:
+        async with lock:
+            result = _DL_CACHE.get(key)
+            if result is None:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    _DL_POOL, download_audio, track.artist_name, track.name, track.duration
+                )
+                if not result.success or result.file_path is None:
+                    return result
+
+                _DL_CACHE[key] = result
+                _DL_KEYS[result.file_path] = key
+
+            _DL_REFS[key] = _DL_REFS.get(key, 0) + 1
+            return result
+    finally:
+        # Drop the lock once no task needs it, whether the download
+        # succeeded, failed or was cancelled
+        _DL_LOCK_USERS[key] -= 1
+        if not _DL_LOCK_USERS[key]:
+            del _DL_LOCK_USERS[key], _DL_LOCKS[key]
+
+
+def _release_audio(file_path: Path) -> None:
+    """
+    Drop one reference to a downloaded file, deleting it after the last.
+
+    Args:
+        file_path: Path from a DownloadResult returned by _acquire_audio()
+    """
+    key = _DL_KEYS.get(file_path)
+    if key is None:
+        cleanup_audio_file(file_path)
+        return
+
+    _DL_REFS[key] -= 1
+    if _DL_REFS[key] > 0:
+        return
+
+    del _DL_REFS[key], _DL_CACHE[key], _DL_KEYS[file_path]
+    cleanup_audio_file(file_path)
+
+
+@asynccontextmanager
+async def managed_audio(track: Track) -> AsyncIterator[DownloadResult]:
+    """
+    Download a track's audio for the duration of an `async with` block.
+
+    The file is released on exit however the block ends (return, error
+    or task cancellation).
+
+    Args:
+        track: Track to download audio for
+
+    Yields:
+        DownloadResult (check success before using file_path)
+    """
+    download_result = await _acquire_audio(track)
+    try:
+        yield download_result
+    finally:
+        if download_result.success and download_result.file_path is not None:
+            _release_audio(download_result.file_path)
+
+
 @dataclass
 class ProcessingStats:
     """Statistics from pipeline run."""
@@ -69,38 +218,55 @@ class ProcessingStats:
     errors: list[str] = field(default_factory=list)
 
 
-def save_segmentation_results(
-    results: list[dict[str, object]],
-    output_path: Optional[Path] = None,
-) -> Path:
+class SegmentationWriter:
     """
-    Save segmentation results to a JSON file.
-
-    Args:
-        results: List of segmentation result dictionaries
-        output_path: Optional custom output path
+    Streams dry-run segmentation results to an NDJSON file (one JSON
+    object per line) as tracks finish, instead of buffering the whole run.
 
-    Returns:
-        Path to the saved file
+    The file is only created once the first result is written.
     """
-    if output_path is None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = OUTPUT_DIR / f"segmentation_results_{timestamp}.json"
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    def __init__(self, output_path: Path | None = None):
+        if output_path is None:
+            # Nanosecond timestamp: runs started in the same second don't collide
+            output_path = OUTPUT_DIR / f"segmentation_results_{time_ns()}.ndjson"
+
+        self.output_path = output_path
+        self.count = 0
+        self._file: BinaryIO | None = None
+
+    def write(self, result: dict[str, object]) -> None:
+        """Append one track's segmentation result."""
+        if self._file is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_path, "wb")
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+        # orjson writes UTF-8 bytes directly (no ensure_ascii escaping)
+        self._file.write(orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE))
+        self.count += 1
 
-    return output_path
+    def close(self) -> Path | None:
+        """
+        Close the file.
+
+        Returns:
+            Path to the written file, or None if nothing was written
+        """
+        if self._file is None:
+            return None
+
+        self._file.close()
+        self._file = None
+        return self.output_path
 
 
 async def process_track(
     track: Track,
     dry_run: bool = False,
     verbose: bool = True,
-    segmentation_cache: Optional[dict[int, BatchedSongResult]] = None,
-) -> tuple[int, list[str], Optional[dict]]:
+    segmentation_cache: dict[int, BatchedSongResult] | None = None,
+    parsed_cache: dict[int, ParsedLRC] | None = None,
+) -> tuple[int, list[str], dict | None]:
     """
     Process a single track through the full pipeline.
 
@@ -109,20 +275,21 @@ async def process_track(
         dry_run: If True, skip audio download and indexing
         verbose: If True, log detailed progress
         segmentation_cache: Pre-computed segmentation results by track_id (from batch)
+        parsed_cache: Parsed lyrics by track_id (from batch); entries are consumed
 
     Returns:
         Tuple of (segments_indexed, error_messages, segmentation_data)
         segmentation_data is only populated during dry_run
     """
-    errors = []
+    log = logger if verbose else _NULL_LOGGER
 
     # 1. Parse LRC lyrics
-    if verbose:
-        logger.print_step("Parsing lyrics", f"{track.duration:.0f}s duration")
-    parsed_lrc = parse_lrc(track.synced_lyrics)
+    log.print_step("Parsing lyrics", f"{track.duration:.0f}s duration")
+    parsed_lrc = parsed_cache.pop(track.id, None) if parsed_cache else None
+    if parsed_lrc is None:
+        parsed_lrc = parse_lrc(track.synced_lyrics)
     if parsed_lrc.total_lines < 4:
-        if verbose:
-            logger.print_skip(f"Too few lines ({parsed_lrc.total_lines})")
+        log.print_skip(f"Too few lines ({parsed_lrc.total_lines})")
         log_skipped_song(
             track_id=track.id,
             title=track.name,
@@ -135,20 +302,22 @@ async def process_track(
         )
         return 0, [f"Track {track.id}: Too few lyrics lines"], None
 
-    if verbose:
-        logger.print_success(f"Parsed {parsed_lrc.total_lines} lines")
+    log.print_success(f"Parsed {parsed_lrc.total_lines} lines")
 
     # 2. Download audio
-    if not dry_run:
-        if verbose:
-            logger.print_step("Downloading audio")
-        download_result = download_audio(
-            track.artist_name, track.name, track.duration
+    if dry_run:
+        log.print_step("Skipping audio download", "dry run")
+        return await _segment_and_index(
+            track, parsed_lrc, None, dry_run, verbose, segmentation_cache
         )
 
+    log.print_step("Downloading audio")
+
+    # The download is released when this block exits - including on
+    # cancellation - so no early return can leak the audio file
+    async with managed_audio(track) as download_result:
         if not download_result.success:
-            if verbose:
-                logger.print_error(f"Download failed: {download_result.error}")
+            log.print_error(f"Download failed: {download_result.error}")
             log_skipped_song(
                 track_id=track.id,
                 title=track.name,
@@ -162,8 +331,7 @@ async def process_track(
             )
             return 0, [f"Track {track.id}: Download failed - {download_result.error}"], None
 
-        if verbose:
-            logger.print_success(f"Downloaded ({download_result.duration:.0f}s)")
+        log.print_success(f"Downloaded ({download_result.duration:.0f}s)")
 
         # 3. Check version match
         if download_result.duration:
@@ -174,8 +342,7 @@ async def process_track(
             )
 
             if not is_match:
-                if verbose:
-                    logger.print_skip(f"Version mismatch (drift: {drift:.1f}s)")
+                log.print_skip(f"Version mismatch (drift: {drift:.1f}s)")
                 log_skipped_song(
                     track_id=track.id,
                     title=track.name,
@@ -186,31 +353,45 @@ async def process_track(
                     reason="version_mismatch",
                     yt_url=download_result.yt_url,
                 )
-                if download_result.file_path:
-                    cleanup_audio_file(download_result.file_path)
                 return 0, [f"Track {track.id}: Version mismatch (drift: {drift:.1f}s)"], None
 
         audio_file = download_result.file_path
         if audio_file is None:
             return 0, [f"Track {track.id}: Download succeeded but no file path"], None
-    else:
-        if verbose:
-            logger.print_step("Skipping audio download", "dry run")
-        audio_file = None
+
+        return await _segment_and_index(
+            track, parsed_lrc, audio_file, dry_run, verbose, segmentation_cache
+        )
+
+
+async def _segment_and_index(
+    track: Track,
+    parsed_lrc: ParsedLRC,
+    audio_file: Path | None,
+    dry_run: bool,
+    verbose: bool,
+    segmentation_cache: dict[int, BatchedSongResult] | None,
+) -> tuple[int, list[str], dict | None]:
+    """
+    Segment a track's lyrics, then slice, embed and index each segment.
+
+    The caller owns audio_file and cleans it up.
+
+    Returns:
+        Same as process_track()
+    """
+    log = logger if verbose else _NULL_LOGGER
+    errors: list[str] = []
 
     # 4. Segment lyrics via LLM (use cache if available)
     cached_result = segmentation_cache.get(track.id) if segmentation_cache else None
 
     if cached_result is not None:
         # Use pre-computed batch segmentation
-        if verbose:
-            logger.print_step("Using cached segmentation", "from batch")
+        log.print_step("Using cached segmentation", "from batch")
 
         if cached_result.error or not cached_result.segments:
-            if verbose:
-                logger.print_error(f"Segmentation failed: {cached_result.error or 'no segments'}")
-            if audio_file:
-                cleanup_audio_file(audio_file)
+            log.print_error(f"Segmentation failed: {cached_result.error or 'no segments'}")
             log_skipped_song(
                 track_id=track.id,
                 title=track.name,
@@ -228,15 +409,13 @@ async def process_track(
         genre = cached_result.genre
         provider = "batch"
 
-        if verbose:
-            logger.print_success(
-                f"Found {len(segments)} segments "
-                f"via batch (genre: {genre})"
-            )
+        log.print_success(
+            f"Found {len(segments)} segments "
+            f"via batch (genre: {genre})"
+        )
     else:
         # No cache - call LLM directly
-        if verbose:
-            logger.print_step("Segmenting lyrics via LLM")
+        log.print_step("Segmenting lyrics via LLM")
         segmentation_result = await segment_lyrics(
             lyrics=parsed_lrc.plain_lyrics,
             title=track.name,
@@ -248,19 +427,13 @@ async def process_track(
             if segmentation_result.retry_after_seconds is not None:
                 retry_mins = int(segmentation_result.retry_after_seconds // 60)
                 retry_secs = int(segmentation_result.retry_after_seconds % 60)
-                if verbose:
-                    logger.print_warning(
-                        f"Rate limited by LLM provider. "
-                        f"Please try again in {retry_mins}m {retry_secs}s"
-                    )
-                if audio_file:
-                    cleanup_audio_file(audio_file)
+                log.print_warning(
+                    f"Rate limited by LLM provider. "
+                    f"Please try again in {retry_mins}m {retry_secs}s"
+                )
                 return 0, [f"Rate limited: retry in {retry_mins}m {retry_secs}s"], None
 
-            if verbose:
-                logger.print_error(f"Segmentation failed: {segmentation_result.error}")
-            if audio_file:
-                cleanup_audio_file(audio_file)
+            log.print_error(f"Segmentation failed: {segmentation_result.error}")
             log_skipped_song(
                 track_id=track.id,
                 title=track.name,
@@ -278,12 +451,11 @@ async def process_track(
         genre = segmentation_result.genre
         provider = segmentation_result.provider
 
-        if verbose:
-            logger.print_success(
-                f"Found {len(segments)} segments "
-                f"via {provider} "
-                f"(genre: {genre})"
-            )
+        log.print_success(
+            f"Found {len(segments)} segments "
+            f"via {provider} "
+            f"(genre: {genre})"
+        )
 
     # 5. Validate segments
     valid_segments, validation_errors = validate_segments(
@@ -293,143 +465,99 @@ async def process_track(
     errors.extend(validation_errors)
 
     if not valid_segments:
-        if verbose:
-            logger.print_error("No valid segments after validation")
-        if audio_file:
-            cleanup_audio_file(audio_file)
+        log.print_error("No valid segments after validation")
         return 0, errors + [f"Track {track.id}: No valid segments"], None
 
     # 6. Process each segment
-    if verbose:
-        logger.print_step(f"Processing {len(valid_segments)} segments")
-
-    vectors = []
-    payloads = []
-
-    for i, segment in enumerate(valid_segments, 1):
-        if verbose:
-            logger.print_segment_info(
-                i,
-                len(valid_segments),
-                segment.primary_emotion,
-                segment.energy,
-                f"{segment.start_line}-{segment.end_line}",
-            )
-        # Validate line numbers against parsed LRC
-        is_valid, error_msg = validate_segment_lines(
-            parsed_lrc,
-            segment.start_line,
-            segment.end_line,
+    log.print_step(f"Processing {len(valid_segments)} segments")
+
+    # Long tracks only show every Nth segment. The last one is always shown:
+    # the logger flushes its buffered lines when it sees segment N of N.
+    total_segments = len(valid_segments)
+    log_every = SEGMENT_LOG_EVERY if total_segments > SEGMENT_LOG_FULL_MAX else 1
+    shown = list(range(1, total_segments + 1, log_every))
+    if shown[-1] != total_segments:
+        shown.append(total_segments)
+    for i in shown:
+        segment = valid_segments[i - 1]
+        log.print_segment_info(
+            i,
+            total_segments,
+            segment.primary_emotion,
+            segment.energy,
+            f"{segment.start_line}-{segment.end_line}",
         )
 
-        if not is_valid:
-            errors.append(f"Segment validation: {error_msg}")
-            continue
-
-        # Get timestamps from LRC
-        start_ts, end_ts = parsed_lrc.get_segment_timestamps(
-            segment.start_line,
-            segment.end_line,
+    # Embed every description in one batched encode (cached ones are reused)
+    try:
+        segment_vectors = await asyncio.to_thread(
+            embed_texts_cached,
+            [segment.ai_description for segment in valid_segments],
         )
-
-        if start_ts is None or end_ts is None:
-            errors.append(f"Could not get timestamps for lines {segment.start_line}-{segment.end_line}")
-            continue
-
-        # Slice audio (if not dry run)
-        snippet_id = generate_snippet_id()
-        snippet_local_path = None
-
-        if not dry_run and audio_file:
-            slice_result = slice_audio(
-                input_file=audio_file,
-                start_time=start_ts,
-                end_time=end_ts,
-                output_name=snippet_id,
+    except Exception as e:
+        log.print_error(f"Embedding failed: {e}")
+        return 0, errors + [f"Track {track.id}: Embedding failed - {e}"], None
+
+    # Segments are independent, so their slicing and uploads overlap
+    # (bounded by SEGMENT_CONCURRENCY)
+    semaphore = asyncio.Semaphore(SEGMENT_CONCURRENCY)
+    outcomes = await asyncio.gather(
+        *[
+            _process_segment(
+                segment,
+                vector,
+                track=track,
+                parsed_lrc=parsed_lrc,
+                audio_file=audio_file,
+                genre=genre,
+                dry_run=dry_run,
+                semaphore=semaphore,
             )
+            for segment, vector in zip(valid_segments, segment_vectors)
+        ],
+        return_exceptions=True,
+    )
 
-            if not slice_result.success or slice_result.file_path is None:
-                errors.append(f"Slice failed: {slice_result.error}")
-                continue
-
-            snippet_local_path = slice_result.file_path
-
-            # Upload to R2 if configured
-            if is_r2_configured():
-                upload_result = await upload_snippet(
-                    file_path=snippet_local_path,
-                    snippet_id=snippet_id,
-                )
-
-                if not upload_result.success or upload_result.url is None:
-                    errors.append(f"R2 upload failed: {upload_result.error}")
-                    cleanup_audio_file(snippet_local_path)
-                    continue
+    # One slot per segment, filled in place; skipped segments leave unused
+    # slots at the end, which are sliced off before indexing
+    vectors = np.empty((len(valid_segments), EMBEDDING_DIMENSION), dtype=np.float32)
+    payload_slots: list[SnippetPayload | None] = [None] * len(valid_segments)
+    n = 0
 
-                snippet_url = upload_result.url
-
-                # Clean up local snippet after successful upload
-                cleanup_audio_file(snippet_local_path)
-            else:
-                # No R2 configured - keep local path
-                snippet_url = str(snippet_local_path)
-        else:
-            snippet_url = f"dry-run://{snippet_id}"
-
-        # Generate embedding
-        embedding_result = embed_text(segment.ai_description)
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            errors.append(f"Segment processing failed: {outcome}")
+            continue
 
-        if not embedding_result.success or embedding_result.vector is None:
-            errors.append(f"Embedding failed: {embedding_result.error}")
+        vector, payload, error = outcome
+        if error is not None:
+            errors.append(error)
             continue
 
-        # Build payload
-        payload = SnippetPayload(
-            snippet_id=snippet_id,
-            song_title=track.name,
-            artist=track.artist_name,
-            album=track.album_name,
-            lyrics=segment.lyrics,
-            ai_description=segment.ai_description,
-            snippet_url=snippet_url,
-            start_time=start_ts,
-            end_time=end_ts,
-            primary_emotion=segment.primary_emotion,
-            secondary_emotion=segment.secondary_emotion,
-            energy=segment.energy,
-            tone=segment.tone,
-            genre=genre or "other",
-            track_id=track.id,
-        )
+        vectors[n] = vector
+        payload_slots[n] = payload
+        n += 1
 
-        vectors.append(embedding_result.vector.tolist())
-        payloads.append(payload)
+    vectors = vectors[:n]
+    payloads = cast(list[SnippetPayload], payload_slots[:n])
 
     # 7. Index to Qdrant
     indexed_count = 0
 
-    if vectors and not dry_run:
-        if verbose:
-            logger.print_step("Indexing to Qdrant", f"{len(vectors)} vectors")
+    if payloads and not dry_run:
+        log.print_step("Indexing to Qdrant", f"{len(vectors)} vectors")
         index_result = await upsert_snippets(vectors, payloads)
 
         if index_result.success:
             indexed_count = index_result.indexed_count
-            if verbose:
-                logger.print_success(f"Indexed {indexed_count} segments")
+            log.print_success(f"Indexed {indexed_count} segments")
         else:
-            if verbose:
-                logger.print_error(f"Indexing failed: {index_result.error}")
+            log.print_error(f"Indexing failed: {index_result.error}")
             errors.append(f"Indexing failed: {index_result.error}")
 
-    elif vectors and dry_run:
+    elif payloads and dry_run:
         indexed_count = len(vectors)  # Would have indexed this many
-        if verbose:
-            logger.print_success(f"Would index {indexed_count} segments (dry run)")
-
-    # Cleanup full audio file
-    if audio_file:
-        cleanup_audio_file(audio_file)
+        log.print_success(f"Would index {indexed_count} segments (dry run)")
 
     # Build segmentation data for dry run output
     segmentation_data = None
@@ -461,13 +589,101 @@ async def process_track(
     return indexed_count, errors, segmentation_data
 
 
+async def _process_segment(
+    segment: Segment,
+    vector: np.ndarray,
+    track: Track,
+    parsed_lrc: ParsedLRC,
+    audio_file: Path | None,
+    genre: str | None,
+    dry_run: bool,
+    semaphore: asyncio.Semaphore,
+) -> tuple[np.ndarray | None, SnippetPayload | None, str | None]:
+    """
+    Slice and upload one segment, and build its payload.
+
+    ffmpeg runs in a worker thread so other segments' uploads proceed
+    meanwhile. The embedding is computed up front for the whole track.
+
+    Returns:
+        Tuple of (vector, payload, error_message); vector and payload are
+        None when error_message is set
+    """
+    # Validate line numbers and get timestamps from LRC in one step
+    resolution = parsed_lrc.resolve_segment(segment.start_line, segment.end_line)
+
+    if not resolution.is_valid:
+        return None, None, f"Segment validation: {resolution.error}"
+
+    start_ts, end_ts = resolution.start_ts, resolution.end_ts
+    if start_ts is None or end_ts is None:
+        return None, None, (
+            f"Could not get timestamps for lines {segment.start_line}-{segment.end_line}"
+        )
+
+    async with semaphore:
+        # Slice audio (if not dry run)
+        snippet_id = generate_snippet_id()
+
+        if not dry_run and audio_file:
+            slice_result = await asyncio.get_running_loop().run_in_executor(
+                _FFMPEG_POOL, slice_audio, audio_file, start_ts, end_ts, snippet_id
+            )
+
+            if not slice_result.success or slice_result.file_path is None:
+                return None, None, f"Slice failed: {slice_result.error}"
+
+            snippet_local_path = slice_result.file_path
+
+            # Upload to R2 if configured
+            if is_r2_configured():
+                upload_result = await upload_snippet(
+                    file_path=snippet_local_path,
+                    snippet_id=snippet_id,
+                )
+
+                # Local snippet is no longer needed either way
+                cleanup_audio_file(snippet_local_path)
+
+                if not upload_result.success or upload_result.url is None:
+                    return None, None, f"R2 upload failed: {upload_result.error}"
+
+                snippet_url = upload_result.url
+            else:
+                # No R2 configured - keep local path
+                snippet_url = str(snippet_local_path)
+        else:
+            snippet_url = f"dry-run://{snippet_id}"
+
+    # Build payload
+    payload = SnippetPayload(
+        snippet_id=snippet_id,
+        song_title=track.name,
+        artist=track.artist_name,
+        album=track.album_name,
+        lyrics=segment.lyrics,
+        ai_description=segment.ai_description,
+        snippet_url=snippet_url,
+        start_time=start_ts,
+        end_time=end_ts,
+        primary_emotion=segment.primary_emotion,
+        secondary_emotion=segment.secondary_emotion,
+        energy=segment.energy,
+        tone=segment.tone,
+        genre=genre or "other",
+        track_id=track.id,
+    )
+
+    return vector, payload, None
+
+
 async def run_pipeline(
-    limit: Optional[int] = None,
-    track_id: Optional[int] = None,
+    limit: int | None = None,
+    track_id: int | None = None,
     dry_run: bool = False,
     verbose: bool = True,
     source: str = "lrclib",
-    genre: Optional[str] = None,
+    genre: str | None = None,
     reprocess: bool = False,
 ) -> ProcessingStats:
     """
@@ -522,15 +738,8 @@ async def run_pipeline(
                 logger.print_error("Curated database not found. Run: uv run python -m src.cli import-playlist --url ... --genre ...")
             return stats
 
-        curated_data = list(get_curated_tracks(
-            db_path=CURATED_DB_PATH,
-            genre=genre,
-            limit=limit,
-            exclude_processed=not reprocess,
-        ))
-
-        # Convert to Track objects
-        tracks = [
+        # Stream rows so only the current batch's lyrics are held in memory
+        track_iter: Iterator[Track] = (
             Track(
                 id=t["id"],
                 name=t["name"],
@@ -539,9 +748,24 @@ async def run_pipeline(
                 duration=t["duration"],
                 synced_lyrics=t["synced_lyrics"],
             )
-            for t in curated_data
-        ]
+            for t in get_curated_tracks(
+                db_path=CURATED_DB_PATH,
+                genre=genre,
+                limit=limit,
+                exclude_processed=not reprocess,
+            )
+        )
+        total_tracks = get_curated_track_count(CURATED_DB_PATH, genre)
+        # Processed IDs aren't tracked per genre, so only subtract when unfiltered
+        if not reprocess and not genre:
+            total_tracks -= get_processed_count("curated")
     elif track_id:
+        if not reprocess and await is_processed_async(source, track_id):
+            stats.tracks_skipped += 1
+            if verbose:
+                logger.print_skip(f"Track {track_id} already processed (use --reprocess)")
+            return stats
+
         # Use efficient single-track lookup
         single_track = get_track_by_id(track_id)
         if single_track is None:
@@ -549,119 +773,211 @@ async def run_pipeline(
             if verbose:
                 logger.print_error(f"Track {track_id} not found")
             return stats
-        tracks = [single_track]
+        track_iter = iter([single_track])
+        total_tracks = 1
     else:
-        tracks = list(get_tracks(limit=limit, exclude_processed=not reprocess))
+        track_iter = get_tracks(limit=limit, exclude_processed=not reprocess)
+        # COUNT(*) over the full LRCLib join is slow; a limit is a good enough estimate
+        if limit is not None:
+            total_tracks = limit
+        else:
+            total_tracks = get_track_count()
+            if not reprocess:
+                total_tracks -= get_processed_count("lrclib")
+
+    # Count queries are used for progress only; tracks are never materialized
+    total_tracks = max(total_tracks, 0)
+    if limit is not None:
+        total_tracks = min(total_tracks, limit)
 
     if verbose:
-        logger.print_success(f"Found {len(tracks)} tracks to process")
+        logger.print_success(f"Found ~{total_tracks} tracks to process")
 
-    # Phase 1: Batch segmentation (if enabled)
+    # Tracks flow from segmentation to processing through a bounded queue:
+    # later batches are segmented while earlier tracks download/embed/index.
+    # None is the shutdown sentinel (one per worker).
     segmentation_cache: dict[int, BatchedSongResult] = {}
+    parsed_cache: dict[int, ParsedLRC] = {}
+    track_queue: asyncio.Queue[tuple[int, Track] | None] = asyncio.Queue(
+        maxsize=BATCH_SIZE_LLM * 2,
+    )
 
-    if ENABLE_BATCH_SEGMENTATION and tracks:
-        if verbose:
-            logger.print_step("Phase 1: Batch segmentation", f"{len(tracks)} tracks in batches of {BATCH_SIZE_LLM}")
+    # Stream segmentation results for dry run
+    segmentation_writer = SegmentationWriter() if dry_run else None
 
-        total_batches = (len(tracks) + BATCH_SIZE_LLM - 1) // BATCH_SIZE_LLM
+    # Paces batch segmentation at the provider's tokens-per-minute ceiling
+    llm_bucket = CostBucket.per_minute(LLM_TOKENS_PER_MINUTE)
 
-        for batch_num, batch_start in enumerate(range(0, len(tracks), BATCH_SIZE_LLM), 1):
-            batch = tracks[batch_start:batch_start + BATCH_SIZE_LLM]
+    async def segmentation_stage() -> None:
+        """Phase 1: batch-segment tracks and hand them to the workers."""
+        try:
+            if not ENABLE_BATCH_SEGMENTATION:
+                for i, track in enumerate(track_iter, 1):
+                    await track_queue.put((i, track))
+                return
 
             if verbose:
-                logger.print_step(f"Batch {batch_num}/{total_batches}", f"{len(batch)} tracks")
-
-            # Pre-parse lyrics and filter valid tracks
-            songs_for_llm: list[tuple[str, str, str, int]] = []
-            for track in batch:
-                parsed = parse_lrc(track.synced_lyrics)
-                if parsed.total_lines >= 4:
-                    songs_for_llm.append((
-                        parsed.plain_lyrics,
-                        track.name,
-                        track.artist_name,
-                        track.id,
-                    ))
-
-            if songs_for_llm:
-                # Flush stdout to prevent Rich console buffering deadlock with async
-                sys.stdout.flush()
-                # Single LLM call for entire batch
-                batch_result = await segment_lyrics_batch(songs_for_llm)
-
-                # Check for rate limiting - stop gracefully if hit
-                if batch_result.retry_after_seconds is not None:
-                    retry_mins = int(batch_result.retry_after_seconds // 60)
-                    retry_secs = int(batch_result.retry_after_seconds % 60)
-                    if verbose:
-                        logger.print_warning(
-                            f"Rate limited by LLM provider. "
-                            f"Please try again in {retry_mins}m {retry_secs}s"
-                        )
-                    stats.errors.append(
-                        f"Rate limited: retry in {retry_mins}m {retry_secs}s"
-                    )
-                    # Return early - can't continue without segmentation
-                    return stats
+                logger.print_step(
+                    "Phase 1: Batch segmentation",
+                    f"{total_tracks} tracks in batches of {BATCH_SIZE_LLM}",
+                )
+
+            total_batches = (total_tracks + BATCH_SIZE_LLM - 1) // BATCH_SIZE_LLM
 
-                # Cache results by track_id
-                for song_result in batch_result.song_results:
-                    segmentation_cache[song_result.track_id] = song_result
+            # Pull one batch at a time from the row iterator so memory stays
+            # O(batch) regardless of how many tracks the run covers
+            batch_start = 0
+            batch_num = 0
+            while batch := list(islice(track_iter, BATCH_SIZE_LLM)):
+                batch_num += 1
+                batch_parsed = parse_lrc_many([track.synced_lyrics for track in batch])
 
                 if verbose:
-                    success_count = sum(1 for r in batch_result.song_results if r.segments)
-                    logger.print_success(f"Segmented {success_count}/{len(songs_for_llm)} tracks")
+                    logger.print_step(
+                        f"Batch {batch_num}/{max(batch_num, total_batches)}",
+                        f"{len(batch)} tracks",
+                    )
+
+                # Filter valid tracks
+                songs_for_llm: list[tuple[str, str, str, int]] = []
+                for track, parsed in zip(batch, batch_parsed):
+                    # Reused by process_track instead of parsing again
+                    parsed_cache[track.id] = parsed
+                    if parsed.total_lines >= 4:
+                        songs_for_llm.append((
+                            parsed.plain_lyrics,
+                            track.name,
+                            track.artist_name,
+                            track.id,
+                        ))
+
+                if songs_for_llm:
+                    # Estimated tokens for this batch, paced against the TPM budget
+                    batch_cost = sum(
+                        estimate_tokens(lyrics) + LLM_TOKENS_PER_SONG_OVERHEAD
+                        for lyrics, *_ in songs_for_llm
+                    )
 
-        if verbose:
-            logger.print_success(f"Phase 1 complete: {len(segmentation_cache)} tracks in cache")
+                    while True:
+                        await llm_bucket.acquire(batch_cost)
+
+                        # Flush stdout to prevent Rich console buffering deadlock with async
+                        sys.stdout.flush()
+                        # Single LLM call for entire batch
+                        batch_result = await segment_lyrics_batch(songs_for_llm)
+
+                        # Short rate-limit windows: wait them out and retry
+                        retry_after = batch_result.retry_after_seconds
+                        if retry_after is None or retry_after > LLM_RATE_LIMIT_MAX_WAIT:
+                            break
+
+                        if verbose:
+                            logger.print_warning(f"Rate limited, retrying in {retry_after:.0f}s")
+                        await asyncio.sleep(retry_after)
+
+                    # Long rate-limit window - stop segmenting; tracks already
+                    # queued are still processed
+                    if batch_result.retry_after_seconds is not None:
+                        retry_mins = int(batch_result.retry_after_seconds // 60)
+                        retry_secs = int(batch_result.retry_after_seconds % 60)
+                        if verbose:
+                            logger.print_warning(
+                                f"Rate limited by LLM provider. "
+                                f"Please try again in {retry_mins}m {retry_secs}s"
+                            )
+                        stats.errors.append(
+                            f"Rate limited: retry in {retry_mins}m {retry_secs}s"
+                        )
+                        return
 
-    # Collect segmentation results for dry run
-    segmentation_results: list[dict[str, object]] = []
+                    # Cache results by track_id
+                    segmentation_cache.update(
+                        {song_result.track_id: song_result for song_result in batch_result.song_results}
+                    )
+
+                    if verbose:
+                        success_count = sum(1 for r in batch_result.song_results if r.segments)
+                        logger.print_success(f"Segmented {success_count}/{len(songs_for_llm)} tracks")
+
+                for offset, track in enumerate(batch, batch_start + 1):
+                    await track_queue.put((offset, track))
+                batch_start += len(batch)
 
-    # Phase 2: Process each track
-    for i, track in enumerate(tracks, 1):
-        try:
             if verbose:
-                logger.print_track_header(i, len(tracks), track.artist_name, track.name)
+                logger.print_success(f"Phase 1 complete: {len(segmentation_cache)} tracks in cache")
 
-            indexed, errors, seg_data = await process_track(
-                track,
-                dry_run=dry_run,
-                verbose=verbose,
-                segmentation_cache=segmentation_cache if ENABLE_BATCH_SEGMENTATION else None,
-            )
+        finally:
+            for _ in range(TRACK_WORKERS):
+                await track_queue.put(None)
 
-            if indexed > 0:
-                stats.tracks_processed += 1
-                stats.segments_indexed += indexed
-                # Mark as processed (skip on dry_run since nothing was indexed)
-                if not dry_run:
-                    mark_processed(source, track.id)
-            else:
-                stats.tracks_skipped += 1
+    async def track_worker() -> None:
+        """Phase 2: process queued tracks until the sentinel arrives."""
+        while (item := await track_queue.get()) is not None:
+            i, track = item
+            try:
+                if verbose:
+                    logger.print_track_header(i, max(i, total_tracks), track.artist_name, track.name)
+
+                indexed, errors, seg_data = await process_track(
+                    track,
+                    dry_run=dry_run,
+                    verbose=verbose,
+                    segmentation_cache=segmentation_cache if ENABLE_BATCH_SEGMENTATION else None,
+                    parsed_cache=parsed_cache,
+                )
 
-            stats.errors.extend(errors)
+                if indexed > 0:
+                    stats.tracks_processed += 1
+                    stats.segments_indexed += indexed
+                    # Mark as processed (skip on dry_run since nothing was indexed)
+                    if not dry_run:
+                        enqueue_processed(source, track.id)
+                else:
+                    stats.tracks_skipped += 1
 
-            # Collect segmentation data for dry run output
-            if seg_data is not None:
-                segmentation_results.append(seg_data)
+                stats.errors.extend(errors)
 
+                # Write segmentation data for dry run output
+                if seg_data is not None and segmentation_writer is not None:
+                    segmentation_writer.write(seg_data)
+
+            except Exception as e:
+                stats.tracks_skipped += 1
+                stats.errors.append(f"Track {track.id} exception: {str(e)}")
+                if verbose:
+                    logger.print_error(f"Exception: {str(e)}")
+
+    try:
+        # A failure in any stage cancels the others; the group only exits once
+        # every task has stopped, so no worker outlives the cleanup below
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(segmentation_stage())
+            for _ in range(TRACK_WORKERS):
+                tasks.create_task(track_worker())
+    finally:
+        # Each step runs even if an earlier one raises
+        try:
+            await asyncio.to_thread(flush_processed)
         except Exception as e:
-            stats.tracks_skipped += 1
-            stats.errors.append(f"Track {track.id} exception: {str(e)}")
+            stats.errors.append(f"Status flush failed: {e!r}")
             if verbose:
-                logger.print_error(f"Exception: {str(e)}")
+                logger.print_error(f"Status flush failed: {e!r}")
+        try:
+            output_file = segmentation_writer.close() if segmentation_writer else None
+        finally:
+            try:
+                await close_s3()
+            finally:
+                await close_clients()
 
     # Unload embedding model to free GPU memory
     if verbose:
         logger.print_step("Unloading embedding model")
     unload_model()
 
-    # Save segmentation results for dry run
-    if dry_run and segmentation_results:
-        output_file = save_segmentation_results(segmentation_results)
-        if verbose:
-            logger.print_success(f"Saved segmentation results to {output_file}")
+    # Report segmentation results for dry run
+    if output_file is not None and verbose:
+        logger.print_success(f"Saved segmentation results to {output_file}")
 
     # Print final summary
     if verbose:
@@ -5,9 +5,16 @@ Tracks which tracks have been processed through the pipeline (success or failure
 Works for both LRCLib and curated sources.
 """
 
+import asyncio
+import atexit
+import queue
 import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Literal
+from typing import Literal
 
 # Database path
 BASE_DIR = Path(__file__).parent.parent
@@ -28,8 +35,13 @@ CREATE TABLE IF NOT EXISTS processed_tracks (
     PRIMARY KEY (source, track_id)
 );
 
-CREATE INDEX IF NOT EXISTS idx_processed_source_status
-ON processed_tracks(source, status);
+-- Covering index for the status-filtered scans (success IDs, failed IDs,
+-- counts): track_ids are read from the index without visiting table rows.
+-- Supersedes the older (source, status) index, which is its prefix.
+CREATE INDEX IF NOT EXISTS idx_processed_source_status_track
+ON processed_tracks(source, status, track_id);
+
+DROP INDEX IF EXISTS idx_processed_source_status;
 """
 
 # Migration to add status column if missing
@@ -39,36 +51,169 @@ ALTER TABLE processed_tracks ADD COLUMN error_message TEXT;
 """
 
 
+# Hot statements as constants: reusing the exact same SQL text on a pooled
+# connection hits sqlite3's prepared-statement cache instead of re-preparing
+UPSERT_SQL = """
+INSERT INTO processed_tracks (source, track_id, status, error_message)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(source, track_id) DO UPDATE SET
+    status = excluded.status,
+    error_message = excluded.error_message,
+    processed_at = CURRENT_TIMESTAMP
+"""
+IS_PROCESSED_SQL = "SELECT 1 FROM processed_tracks WHERE source = ? AND track_id = ?"
+PROCESSED_IDS_SQL = "SELECT track_id FROM processed_tracks WHERE source = ?"
+SUCCESS_IDS_SQL = "SELECT track_id FROM processed_tracks WHERE source = ? AND status = 'success'"
+FAILED_IDS_SQL = (
+    "SELECT track_id FROM processed_tracks WHERE source = ? AND status IN ('failed', 'skipped')"
+)
+# get_processed_count() statements keyed by (filter by source, filter by status)
+COUNT_SQL = {
+    (False, False): "SELECT COUNT(*) FROM processed_tracks",
+    (True, False): "SELECT COUNT(*) FROM processed_tracks WHERE source = ?",
+    (False, True): "SELECT COUNT(*) FROM processed_tracks WHERE status = ?",
+    (True, True): "SELECT COUNT(*) FROM processed_tracks WHERE source = ? AND status = ?",
+}
+
+
+def _scalar_row(cursor: sqlite3.Cursor, row: tuple) -> object:
+    """Row factory yielding a single-column row's value instead of a 1-tuple."""
+    return row[0]
+
+
+# One connection per (thread, database), kept open for the process lifetime.
+# close_all() bumps the generation so threads drop their closed handles.
+_local = threading.local()
+_all_conns: list[sqlite3.Connection] = []
+_all_conns_lock = threading.Lock()
+_generation = 0
+
+# Databases whose schema/migration has been applied by this process
+_INITIALIZED: set[Path] = set()
+
+# Databases known to exist on disk (see _db_exists)
+_DB_EXISTS: set[Path] = set()
+
+
+def _get_conn(db_path: Path = PIPELINE_STATUS_DB) -> sqlite3.Connection:
+    """
+    Get this thread's connection to a status database, opening it on first use.
+
+    Reusing the connection skips the per-call open cost and keeps SQLite's
+    page cache warm across lookups. PRAGMAs are applied once, on open.
+
+    Args:
+        db_path: Path to status database
+
+    Returns:
+        Open connection (do not close; see close_all())
+    """
+    if getattr(_local, "generation", None) != _generation:
+        _local.conns = {}
+        _local.generation = _generation
+
+    conns: dict[Path, sqlite3.Connection] = _local.conns
+    conn = conns.get(db_path)
+
+    if conn is None:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Only ever used by the owning thread; shared so close_all() can close it
+        conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        conn.execute("PRAGMA mmap_size=268435456")  # 256 MB: reads via mmap, not pread
+        conns[db_path] = conn
+        with _all_conns_lock:
+            _all_conns.append(conn)
+
+    return conn
+
+
+def close_all() -> None:
+    """
+    Close every pooled connection (call at shutdown).
+
+    Threads that query again afterwards transparently open new connections.
+    """
+    global _generation
+
+    with _all_conns_lock:
+        conns = _all_conns[:]
+        _all_conns.clear()
+        _generation += 1
+
+    for conn in conns:
+        conn.close()
+
+
+atexit.register(close_all)
+# Registered after close_all so it runs first (atexit is LIFO)
+atexit.register(lambda: _write_queue.join())
+
+
 def init_status_db(db_path: Path = PIPELINE_STATUS_DB) -> None:
-    """Initialize the pipeline status database."""
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.executescript(SCHEMA)
+    """
+    Initialize the pipeline status database.
+
+    The connection from _get_conn() has already switched the file to WAL
+    with synchronous=NORMAL, so commits no longer fsync the main database.
+    """
+    conn = _get_conn(db_path)
+    conn.executescript(SCHEMA)
+    conn.commit()
+
+    # Check if migration needed (status column missing)
+    cursor = conn.execute("PRAGMA table_info(processed_tracks)")
+    columns = {row[1] for row in cursor.fetchall()}
+
+    if "status" not in columns:
+        # Run migration
+        for stmt in MIGRATION.strip().split(";"):
+            if stmt.strip():
+                try:
+                    conn.execute(stmt)
+                except sqlite3.OperationalError:
+                    pass  # Column already exists
         conn.commit()
 
-        # Check if migration needed (status column missing)
-        cursor = conn.execute("PRAGMA table_info(processed_tracks)")
-        columns = {row[1] for row in cursor.fetchall()}
-
-        if "status" not in columns:
-            # Run migration
-            for stmt in MIGRATION.strip().split(";"):
-                if stmt.strip():
-                    try:
-                        conn.execute(stmt)
-                    except sqlite3.OperationalError:
-                        pass  # Column already exists
-            conn.commit()
-    finally:
-        conn.close()
+    # Refresh planner statistics so ID scans pick the covering indexes
+    # ((source, track_id) primary key / (source, status, track_id))
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _db_exists(db_path: Path) -> bool:
+    """
+    Whether a status database exists, remembering positive answers.
+
+    Status databases are never deleted while the pipeline runs, so once a
+    file has been seen (or created) read calls skip the stat() syscall.
+    """
+    if db_path in _DB_EXISTS:
+        return True
+
+    if db_path.exists():
+        _DB_EXISTS.add(db_path)
+        return True
+
+    return False
+
+
+def _ensure_initialized(db_path: Path) -> None:
+    """Run init_status_db() once per database per process."""
+    if db_path not in _INITIALIZED:
+        init_status_db(db_path)
+        _INITIALIZED.add(db_path)
+        _DB_EXISTS.add(db_path)
 
 
 def mark_processed(
     source: str,
     track_id: int,
     status: TrackStatus = "success",
-    error_message: Optional[str] = None,
+    error_message: str | None = None,
     db_path: Path = PIPELINE_STATUS_DB,
 ) -> None:
     """
@@ -81,23 +226,10 @@ def mark_processed(
         error_message: Error details if failed/skipped
         db_path: Path to status database
     """
-    init_status_db(db_path)
-    conn = sqlite3.connect(db_path)
-    try:
-        conn.execute(
-            """
-            INSERT INTO processed_tracks (source, track_id, status, error_message)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(source, track_id) DO UPDATE SET
-                status = excluded.status,
-                error_message = excluded.error_message,
-                processed_at = CURRENT_TIMESTAMP
-            """,
-            (source, track_id, status, error_message),
-        )
-        conn.commit()
-    finally:
-        conn.close()
+    _ensure_initialized(db_path)
+    conn = _get_conn(db_path)
+    conn.execute(UPSERT_SQL, (source, track_id, status, error_message))
+    conn.commit()
 
 
 def is_processed(
@@ -116,18 +248,12 @@ def is_processed(
     Returns:
         True if track has been processed (any status)
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
         return False
 
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "SELECT 1 FROM processed_tracks WHERE source = ? AND track_id = ?",
-            (source, track_id),
-        )
-        return cursor.fetchone() is not None
-    finally:
-        conn.close()
+    conn = _get_conn(db_path)
+    cursor = conn.execute(IS_PROCESSED_SQL, (source, track_id))
+    return cursor.fetchone() is not None
 
 
 def get_processed_ids(
@@ -146,24 +272,63 @@ def get_processed_ids(
     Returns:
         Set of processed track IDs for O(1) lookup
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
         return set()
 
-    conn = sqlite3.connect(db_path)
-    try:
-        if include_failed:
-            cursor = conn.execute(
-                "SELECT track_id FROM processed_tracks WHERE source = ?",
-                (source,),
-            )
-        else:
-            cursor = conn.execute(
-                "SELECT track_id FROM processed_tracks WHERE source = ? AND status = 'success'",
-                (source,),
-            )
-        return {row[0] for row in cursor.fetchall()}
-    finally:
-        conn.close()
+    # Row factory set on the cursor, not the pooled connection
+    cursor = _get_conn(db_path).cursor()
+    cursor.row_factory = _scalar_row
+    cursor.execute(PROCESSED_IDS_SQL if include_failed else SUCCESS_IDS_SQL, (source,))
+    return set(cursor)
+
+
+def _db_version(db_path: Path) -> tuple[int, ...]:
+    """Change marker for a database: mtime/size of the file and its WAL."""
+    wal_path = db_path.with_name(db_path.name + "-wal")
+    version = []
+    for path in (db_path, wal_path):
+        try:
+            st = path.stat()
+            version += [st.st_mtime_ns, st.st_size]
+        except FileNotFoundError:
+            version += [0, 0]
+    return tuple(version)
+
+
+@lru_cache(maxsize=4)
+def _processed_ids_at(
+    source: str,
+    include_failed: bool,
+    db_path: Path,
+    version: tuple[int, ...],
+) -> frozenset[int]:
+    """get_processed_ids() memoized per database version."""
+    return frozenset(get_processed_ids(source, include_failed, db_path))
+
+
+def get_processed_ids_cached(
+    source: str,
+    include_failed: bool = True,
+    db_path: Path = PIPELINE_STATUS_DB,
+) -> frozenset[int]:
+    """
+    Like get_processed_ids(), but reuses the set until the database changes.
+
+    Keyed on the mtime and size of the database and its WAL file, so any
+    write invalidates it while repeated calls within a run skip the scan.
+
+    Args:
+        source: "lrclib" or "curated"
+        include_failed: Include failed/skipped tracks (default True)
+        db_path: Path to status database
+
+    Returns:
+        Frozen set of processed track IDs
+    """
+    if not _db_exists(db_path):
+        return frozenset()
+
+    return _processed_ids_at(source, include_failed, db_path, _db_version(db_path))
 
 
 def get_failed_ids(
@@ -180,23 +345,18 @@ def get_failed_ids(
     Returns:
         Set of failed track IDs
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
         return set()
 
-    conn = sqlite3.connect(db_path)
-    try:
-        cursor = conn.execute(
-            "SELECT track_id FROM processed_tracks WHERE source = ? AND status IN ('failed', 'skipped')",
-            (source,),
-        )
-        return {row[0] for row in cursor.fetchall()}
-    finally:
-        conn.close()
+    cursor = _get_conn(db_path).cursor()
+    cursor.row_factory = _scalar_row
+    cursor.execute(FAILED_IDS_SQL, (source,))
+    return set(cursor)
 
 
 def get_processed_count(
-    source: Optional[str] = None,
-    status: Optional[TrackStatus] = None,
+    source: str | None = None,
+    status: TrackStatus | None = None,
     db_path: Path = PIPELINE_STATUS_DB,
 ) -> int:
     """
@@ -210,33 +370,196 @@ def get_processed_count(
     Returns:
         Number of processed tracks
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
+        return 0
+
+    params = [value for value in (source, status) if value]
+    cursor = _get_conn(db_path).execute(COUNT_SQL[bool(source), bool(status)], params)
+    return cursor.fetchone()[0]
+
+
+def mark_processed_many(
+    rows: Iterable[tuple[str, int, TrackStatus, str | None]],
+    db_path: Path = PIPELINE_STATUS_DB,
+) -> int:
+    """
+    Mark many tracks as processed in a single transaction.
+
+    One commit for the whole batch instead of one per track.
+
+    Args:
+        rows: (source, track_id, status, error_message) tuples
+        db_path: Path to status database
+
+    Returns:
+        Number of rows written
+    """
+    rows = list(rows)
+    if not rows:
         return 0
 
-    conn = sqlite3.connect(db_path)
+    _ensure_initialized(db_path)
+    conn = _get_conn(db_path)
+    conn.execute("BEGIN IMMEDIATE")
     try:
-        conditions = []
-        params = []
+        conn.executemany(UPSERT_SQL, rows)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return len(rows)
 
-        if source:
-            conditions.append("source = ?")
-            params.append(source)
-        if status:
-            conditions.append("status = ?")
-            params.append(status)
 
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-        cursor = conn.execute(
-            f"SELECT COUNT(*) FROM processed_tracks WHERE {where_clause}",
-            params,
-        )
-        return cursor.fetchone()[0]
-    finally:
-        conn.close()
+# Background writer: coalesces enqueue_processed() calls into one
+# transaction per batch so callers never wait on a commit
+WRITER_BATCH_SIZE = 5000
+WRITER_FLUSH_INTERVAL = 0.25  # seconds
+WRITER_MAX_RETRIES = 3
+WRITER_RETRY_DELAY = 0.5  # seconds, doubled per attempt
+
+_write_queue: "queue.Queue[tuple[Path, tuple[str, int, TrackStatus, str | None]]]" = queue.Queue()
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+
+# Rows the writer gave up on, per database. flush_processed() makes one
+# more attempt before reporting them.
+_failed_rows: dict[Path, list[tuple[str, int, TrackStatus, str | None]]] = {}
+
+
+def _write_with_retry(
+    rows: list[tuple[str, int, TrackStatus, str | None]],
+    db_path: Path,
+) -> None:
+    """mark_processed_many() with backoff for transient errors (e.g. database locked)."""
+    for attempt in range(WRITER_MAX_RETRIES):
+        try:
+            mark_processed_many(rows, db_path)
+            return
+        except Exception:
+            if attempt == WRITER_MAX_RETRIES - 1:
+                raise
+            time.sleep(WRITER_RETRY_DELAY * 2**attempt)
+
+
+def _writer_loop() -> None:
+    """Drain the write queue in batches (runs on the writer thread)."""
+    while True:
+        batch = [_write_queue.get()]
+        deadline = time.monotonic() + WRITER_FLUSH_INTERVAL
+
+        while len(batch) < WRITER_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_write_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        rows_by_db: dict[Path, list[tuple[str, int, TrackStatus, str | None]]] = {}
+        for db_path, row in batch:
+            rows_by_db.setdefault(db_path, []).append(row)
+
+        try:
+            # One database failing must not drop the others' rows
+            for db_path, rows in rows_by_db.items():
+                try:
+                    _write_with_retry(rows, db_path)
+                except Exception:
+                    with _writer_lock:
+                        _failed_rows.setdefault(db_path, []).extend(rows)
+        finally:
+            for _ in batch:
+                _write_queue.task_done()
+
+
+def enqueue_processed(
+    source: str,
+    track_id: int,
+    status: TrackStatus = "success",
+    error_message: str | None = None,
+    db_path: Path = PIPELINE_STATUS_DB,
+) -> None:
+    """
+    Queue a mark_processed() write for the background writer and return immediately.
+
+    Writes are batched (up to WRITER_BATCH_SIZE rows or WRITER_FLUSH_INTERVAL
+    seconds per transaction). Call flush_processed() before relying on them.
+
+    Args:
+        source: "lrclib" or "curated"
+        track_id: The track ID from the source database
+        status: "success", "failed", or "skipped"
+        error_message: Error details if failed/skipped
+        db_path: Path to status database
+    """
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(
+                    target=_writer_loop,
+                    name="pipeline-status-writer",
+                    daemon=True,
+                )
+                _writer.start()
+
+    _write_queue.put((db_path, (source, track_id, status, error_message)))
+
+
+def flush_processed() -> None:
+    """
+    Block until every queued write has been committed.
+
+    Rows the background writer could not commit are retried once more here;
+    rows that still fail are kept for the next flush.
+
+    Raises:
+        ExceptionGroup: One error per database whose rows could not be written
+    """
+    _write_queue.join()
+
+    with _writer_lock:
+        pending = dict(_failed_rows)
+        _failed_rows.clear()
+
+    errors: list[Exception] = []
+    for db_path, rows in pending.items():
+        try:
+            _write_with_retry(rows, db_path)
+        except Exception as e:
+            with _writer_lock:
+                _failed_rows.setdefault(db_path, []).extend(rows)
+            e.add_note(f"{len(rows)} status rows not written to {db_path}")
+            errors.append(e)
+
+    if errors:
+        raise ExceptionGroup("pipeline status writes failed", errors)
+
+
+async def mark_processed_async(
+    source: str,
+    track_id: int,
+    status: TrackStatus = "success",
+    error_message: str | None = None,
+    db_path: Path = PIPELINE_STATUS_DB,
+) -> None:
+    """mark_processed() on a worker thread, so the event loop isn't blocked on the commit."""
+    await asyncio.to_thread(mark_processed, source, track_id, status, error_message, db_path)
+
+
+async def is_processed_async(
+    source: str,
+    track_id: int,
+    db_path: Path = PIPELINE_STATUS_DB,
+) -> bool:
+    """is_processed() on a worker thread, for use from async code."""
+    return await asyncio.to_thread(is_processed, source, track_id, db_path)
 
 
 def clear_failed(
-    source: Optional[str] = None,
+    source: str | None = None,
     db_path: Path = PIPELINE_STATUS_DB,
 ) -> int:
     """
@@ -249,28 +572,25 @@ def clear_failed(
     Returns:
         Number of records deleted
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
         return 0
 
-    conn = sqlite3.connect(db_path)
-    try:
-        if source:
-            cursor = conn.execute(
-                "DELETE FROM processed_tracks WHERE source = ? AND status IN ('failed', 'skipped')",
-                (source,),
-            )
-        else:
-            cursor = conn.execute(
-                "DELETE FROM processed_tracks WHERE status IN ('failed', 'skipped')"
-            )
-        conn.commit()
-        return cursor.rowcount
-    finally:
-        conn.close()
+    conn = _get_conn(db_path)
+    if source:
+        cursor = conn.execute(
+            "DELETE FROM processed_tracks WHERE source = ? AND status IN ('failed', 'skipped')",
+            (source,),
+        )
+    else:
+        cursor = conn.execute(
+            "DELETE FROM processed_tracks WHERE status IN ('failed', 'skipped')"
+        )
+    conn.commit()
+    return cursor.rowcount
 
 
 def clear_processed(
-    source: Optional[str] = None,
+    source: str | None = None,
     db_path: Path = PIPELINE_STATUS_DB,
 ) -> int:
     """
@@ -283,19 +603,16 @@ def clear_processed(
     Returns:
         Number of records deleted
     """
-    if not db_path.exists():
+    if not _db_exists(db_path):
         return 0
 
-    conn = sqlite3.connect(db_path)
-    try:
-        if source:
-            cursor = conn.execute(
-                "DELETE FROM processed_tracks WHERE source = ?",
-                (source,),
-            )
-        else:
-            cursor = conn.execute("DELETE FROM processed_tracks")
-        conn.commit()
-        return cursor.rowcount
-    finally:
-        conn.close()
+    conn = _get_conn(db_path)
+    if source:
+        cursor = conn.execute(
+            "DELETE FROM processed_tracks WHERE source = ?",
+            (source,),
+        )
+    else:
+        cursor = conn.execute("DELETE FROM processed_tracks")
+    conn.commit()
+    return cursor.rowcount
@@ -0,0 +1,67 @@
+"""
+Async rate limiting for metered provider APIs.
+
+Used to pace LLM calls against a tokens-per-minute budget so the
+pipeline runs at the provider's ceiling instead of hitting 429s.
+"""
+
+import asyncio
+import time
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for English-ish text (~4 characters per token).
+
+    Args:
+        text: Prompt or lyrics text
+
+    Returns:
+        Estimated token count
+    """
+    return len(text) // 4
+
+
+class CostBucket:
+    """
+    Token bucket where each acquire() can cost more than one unit.
+
+    Refills continuously at `refill_per_second` up to `capacity`. Waiters
+    are served in order (the lock is held while waiting), so a large batch
+    isn't starved by a stream of small ones.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.refill_per_second)
+        self.last = now
+
+    async def acquire(self, cost: float) -> None:
+        """
+        Wait until `cost` units are available, then take them.
+
+        Costs above capacity are clamped so they can't wait forever.
+
+        Args:
+            cost: Units to consume (e.g. estimated tokens)
+        """
+        cost = min(cost, self.capacity)
+
+        async with self._lock:
+            self._refill()
+            while self.tokens < cost:
+                await asyncio.sleep((cost - self.tokens) / self.refill_per_second)
+                self._refill()
+            self.tokens -= cost
+
+    @classmethod
+    def per_minute(cls, limit: float) -> "CostBucket":
+        """Bucket for a per-minute budget (e.g. provider TPM)."""
+        return cls(capacity=limit, refill_per_second=limit / 60)
@@ -0,0 +1,96 @@
+"""
+Persistent cache of single-song LLM segmentations.
+
+Keyed by BLAKE2b of (artist, title, lyrics) so re-running a song - after a
+downstream failure, a resumed run, or a provider switch - reuses the
+earlier answer instead of paying for another LLM call. Stored in SQLite
+(WAL) as orjson-encoded results.
+"""
+
+import hashlib
+from typing import Any
+
+import orjson
+
+from .config import SEGMENTATION_CACHE_PATH
+from .sqlite_cache import CacheDB
+
+# Bump when the prompt or the stored shape changes to ignore old entries
+CACHE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS segmentations (
+    key TEXT PRIMARY KEY,
+    result BLOB NOT NULL
+);
+"""
+
+_db = CacheDB(SEGMENTATION_CACHE_PATH, SCHEMA)
+
+
+def make_key(artist: str, title: str, lyrics: str) -> str:
+    """
+    Build the cache key for a song.
+
+    Args:
+        artist: Artist name
+        title: Song title
+        lyrics: Plain lyrics text sent to the LLM
+
+    Returns:
+        Hex digest
+    """
+    raw = f"{CACHE_VERSION}\x00{artist}\x00{title}\x00{lyrics}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def get(key: str) -> dict[str, Any] | None:
+    """
+    Look up a cached segmentation.
+
+    Args:
+        key: Key from make_key()
+
+    Returns:
+        Dict with genre, provider and segments (list of Segment dicts),
+        or None on miss
+    """
+    with _db.lock:
+        row = _db.conn().execute(
+            "SELECT result FROM segmentations WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+    if row is None:
+        return None
+
+    return orjson.loads(row[0])
+
+
+def put(key: str, result: dict[str, Any]) -> None:
+    """
+    Store a segmentation.
+
+    Args:
+        key: Key from make_key()
+        result: Dict with genre, provider and segments (list of Segment dicts)
+    """
+    blob = orjson.dumps(result)
+
+    with _db.lock:
+        _db.conn().execute(
+            "INSERT OR REPLACE INTO segmentations (key, result) VALUES (?, ?)",
+            (key, blob),
+        )
+
+
+def clear() -> int:
+    """
+    Delete every cached segmentation.
+
+    Returns:
+        Number of entries removed
+    """
+    with _db.lock:
+        cursor = _db.conn().execute("DELETE FROM segmentations")
+        return cursor.rowcount
@@ -9,22 +9,52 @@ All API calls are async for efficient network IO.
 
 import asyncio
 import json
-from dataclasses import dataclass
-from typing import Any, Optional
-
+import random
+import re
+import sys
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any
+
+import httpx
+import numpy as np
+import orjson
+from groq import APIConnectionError as GroqConnectionError
+from groq import APIStatusError as GroqStatusError
 from groq import RateLimitError as GroqRateLimitError
 
+from . import segmentation_cache
 from .config import (
+    LLM_BATCH_API_MAX_WAIT,
+    LLM_BATCH_API_POLL_INTERVAL,
+    LLM_BATCH_API_WINDOW,
+    LLM_CONTEXT_TOKENS,
+    LLM_HEDGE_DELAY,
+    LLM_MAX_RESPONSE_TOKENS,
     LLM_MODEL_GROQ,
     LLM_MODEL_TOGETHER,
     LLM_PROVIDERS,
+    LLM_RACE_PROVIDERS,
+    LLM_RESPONSE_TOKENS_PER_SONG,
+    LLM_USE_BATCH_API,
     MAX_RETRIES,
     RETRY_DELAY,
+    RETRY_MAX_DELAY,
+    MissingAPIKeyError,
     get_api_key,
 )
+from .ratelimit import estimate_tokens
+
+# Markdown code fence around the JSON (```json ... ``` or ``` ... ```);
+# an unterminated fence runs to the end of the response
+_JSON_FENCE_RE = re.compile(r"```(?:json)?(.*?)(?:```|\Z)", re.DOTALL)
 
+# Fallback parser for objects followed by trailing text (orjson rejects it)
+_JSON_DECODER = json.JSONDecoder()
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class Segment:
     """A meaningful segment of lyrics identified by the LLM."""
 
@@ -33,7 +63,7 @@ class Segment:
     lyrics: str
     ai_description: str
     primary_emotion: str
-    secondary_emotion: Optional[str]
+    secondary_emotion: str | None
     energy: str  # low, medium, high, very-high
     tone: str
 
@@ -51,19 +81,19 @@ class Segment:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SegmentationResult:
     """Result of lyrics segmentation."""
 
     success: bool
     segments: list[Segment]
-    genre: Optional[str]  # Genre detected by LLM
-    provider: Optional[str]  # Which LLM provider was used
-    error: Optional[str] = None
-    retry_after_seconds: Optional[float] = None  # Set when rate limited
+    genre: str | None  # Genre detected by LLM
+    provider: str | None  # Which LLM provider was used
+    error: str | None = None
+    retry_after_seconds: float | None = None  # Set when rate limited
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchedSongResult:
     """Result for a single song in a batch segmentation."""
 
@@ -71,31 +101,65 @@ class BatchedSongResult:
     song_index: int  # Position in batch (1-indexed)
     title: str
     artist: str
-    genre: Optional[str]
+    genre: str | None
     segments: list[Segment]
-    error: Optional[str] = None
+    error: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchSegmentationResult:
     """Result of batched lyrics segmentation."""
 
     success: bool
     song_results: list[BatchedSongResult]
-    provider: Optional[str]
-    error: Optional[str] = None
-    retry_after_seconds: Optional[float] = None  # Set when rate limited
+    provider: str | None
+    error: str | None = None
+    retry_after_seconds: float | None = None  # Set when rate limited
 
 
-# Valid genre values for normalization
-VALID_GENRES = {
+# Valid genre values for normalization (interned, so comparisons against
+# them and against interned LLM labels short-circuit on identity)
+VALID_GENRES = frozenset(sys.intern(genre) for genre in (
     "afrobeats", "reggaeton", "dancehall", "hip-hop", "r&b", "pop", "rock",
     "country", "latin", "electronic", "folk", "jazz", "classical", "metal",
     "indie", "soul", "funk", "gospel", "blues", "reggae", "punk", "disco",
     "house", "techno", "trap", "drill", "afropop", "amapiano", "kizomba",
-    "soca", "calypso", "bachata", "salsa", "cumbia", "merengue", "other"
+    "soca", "calypso", "bachata", "salsa", "cumbia", "merengue", "other",
+))
+
+# Common LLM genre spellings mapped to a valid genre
+GENRE_ALIASES = {
+    "hiphop": "hip-hop",
+    "hip hop": "hip-hop",
+    "rnb": "r&b",
+    "rhythm and blues": "r&b",
+    "afro": "afrobeats",
+    "afro-beats": "afrobeats",
+    "dancehall/reggae": "dancehall",
+    "edm": "electronic",
+    "dance": "electronic",
+    "alternative": "indie",
+    "alt rock": "indie",
+    "alt-rock": "indie",
+    "alternative rock": "indie",
+    "urban": "hip-hop",
+    "tropical": "latin",
+    "world": "other",
+}
+
+# Exact matches and aliases in one lookup
+_GENRE_MAP = {genre: genre for genre in VALID_GENRES} | {
+    alias: sys.intern(genre) for alias, genre in GENRE_ALIASES.items()
 }
 
+# Longest first, so the result doesn't depend on set iteration order and,
+# at any one position, the alternation prefers "afropop" over "pop"
+_GENRES_BY_LENGTH = tuple(sorted(VALID_GENRES, key=lambda g: (-len(g), g)))
+_GENRE_RE = re.compile("|".join(map(re.escape, _GENRES_BY_LENGTH)))
+
+# System message sent with every segmentation request
+SYSTEM_PROMPT = "You are a music analysis expert. Output only valid JSON."
+
 # Prompt template for LLM segmentation
 SEGMENTATION_PROMPT = """You are analyzing song lyrics to identify emotionally meaningful segments that could be sent in a conversation as a response.
 
@@ -189,16 +253,40 @@ Important:
 - Output ONLY the JSON, no other text"""
 
 
+def _intern_label(value: Any) -> Any:
+    """Intern a short LLM label (emotion/energy/tone); non-strings pass through."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@lru_cache(maxsize=2048)
 def _create_numbered_lyrics(lyrics: str) -> str:
-    """Add line numbers to lyrics for the prompt."""
-    lines = lyrics.strip().split("\n")
-    numbered = []
-    line_num = 0
-    for line in lines:
-        if line.strip():  # Skip empty lines in numbering
-            line_num += 1
-            numbered.append(f"{line_num}. {line}")
-    return "\n".join(numbered)
+    """Add line numbers to lyrics for the prompt (memoized across retries)."""
+    # Empty lines are skipped in numbering
+    lines = filter(str.strip, lyrics.strip().split("\n"))
+    return "\n".join([f"{i}. {line}" for i, line in enumerate(lines, 1)])
+
+
+@lru_cache(maxsize=256)
+def _build_prompt(title: str, artist: str, lyrics: str) -> str:
+    """
+    Build the single-song segmentation prompt.
+
+    Memoized so a song that is re-segmented (retry after a failed batch,
+    resumed run) reuses the formatted prompt instead of rebuilding it.
+
+    Args:
+        title: Song title
+        artist: Artist name
+        lyrics: Plain lyrics text (without timestamps)
+
+    Returns:
+        Complete prompt string
+    """
+    return SEGMENTATION_PROMPT.format_map({
+        "title": title,
+        "artist": artist,
+        "numbered_lyrics": _create_numbered_lyrics(lyrics),
+    })
 
 
 def _build_batched_prompt(
@@ -227,90 +315,124 @@ Lyrics (with line numbers):
     return BATCHED_SEGMENTATION_PROMPT.format(songs_section=songs_section)
 
 
-def _normalize_genre(genre: Optional[str]) -> str:
+@lru_cache(maxsize=2048)
+def _normalize_genre(genre: str | None) -> str:
     """Normalize genre to a valid value."""
     if not genre:
         return "other"
 
     genre_lower = genre.lower().strip()
 
-    # Direct match
-    if genre_lower in VALID_GENRES:
-        return genre_lower
-
-    # Common aliases
-    aliases = {
-        "hiphop": "hip-hop",
-        "hip hop": "hip-hop",
-        "rnb": "r&b",
-        "rhythm and blues": "r&b",
-        "afro": "afrobeats",
-        "afro-beats": "afrobeats",
-        "dancehall/reggae": "dancehall",
-        "edm": "electronic",
-        "dance": "electronic",
-        "alternative": "indie",
-        "alt rock": "indie",
-        "alt-rock": "indie",
-        "alternative rock": "indie",
-        "urban": "hip-hop",
-        "tropical": "latin",
-        "world": "other",
-    }
-
-    if genre_lower in aliases:
-        return aliases[genre_lower]
-
-    # Partial match
-    for valid_genre in VALID_GENRES:
-        if valid_genre in genre_lower or genre_lower in valid_genre:
-            return valid_genre
+    # Direct match or common alias
+    hit = _GENRE_MAP.get(genre_lower)
+    if hit is not None:
+        return hit
+
+    # Partial match: the leftmost valid genre inside the value (longest one
+    # at that position), or the value inside a valid genre (e.g. "hip" -> "hip-hop")
+    match = _GENRE_RE.search(genre_lower)
+    if match is not None:
+        return _GENRE_MAP[match.group(0)]
+
+    if genre_lower:
+        for valid_genre in _GENRES_BY_LENGTH:
+            if genre_lower in valid_genre:
+                return valid_genre
 
     return "other"
 
 
+def _load_json_response(response_text: str) -> Any:
+    """
+    Parse the JSON object out of an LLM response.
+
+    Handles markdown code fences (```json or bare ```) and extra text
+    before/after the object. The object is bounded by the decoder itself,
+    so trailing text - even text containing braces - needs no extra scan.
+
+    Raises:
+        json.JSONDecodeError: If no valid JSON object is found
+    """
+    fence = _JSON_FENCE_RE.search(response_text)
+    if fence is not None:
+        response_text = fence.group(1)
+
+    start = response_text.find("{")
+    if start == -1:
+        return orjson.loads(response_text.strip())
+
+    try:
+        # Common case: nothing after the object but whitespace
+        return orjson.loads(response_text[start:])
+    except orjson.JSONDecodeError:
+        # Trailing text: stop at the end of the first complete value
+        return _JSON_DECODER.raw_decode(response_text, start)[0]
+
+
+# Required fields of an LLM segment dict, extracted in one call
+_SEGMENT_FIELDS = itemgetter(
+    "start_line", "end_line", "lyrics", "ai_description", "primary_emotion", "energy", "tone"
+)
+
+
+def _segment_from_dict(seg: dict[str, Any]) -> Segment:
+    """
+    Build a Segment from one of the LLM's segment dicts.
+
+    Raises:
+        KeyError, TypeError, ValueError: If the segment is malformed
+    """
+    start_line, end_line, lyrics, ai_description, primary_emotion, energy, tone = (
+        _SEGMENT_FIELDS(seg)
+    )
+    return Segment(
+        int(start_line),
+        int(end_line),
+        lyrics,
+        ai_description,
+        _intern_label(primary_emotion),
+        _intern_label(seg.get("secondary_emotion")),
+        _intern_label(energy),
+        _intern_label(tone),
+    )
+
+
+def _build_segments(raw_segments: list[dict[str, Any]]) -> list[Segment]:
+    """
+    Build Segment objects from the LLM's segment dicts.
+
+    Raises:
+        KeyError, TypeError, ValueError: If a segment is malformed
+    """
+    return list(map(_segment_from_dict, raw_segments))
+
+
 def _parse_segments_response(response_text: str) -> tuple[str, list[Segment]]:
     """Parse LLM response into genre and Segment objects."""
-    # Try to extract JSON from response
-    response_text = response_text.strip()
-
-    # Handle case where LLM adds extra text before/after JSON
-    if "```json" in response_text:
-        start = response_text.find("```json") + 7
-        end = response_text.find("```", start)
-        response_text = response_text[start:end].strip()
-    elif "```" in response_text:
-        start = response_text.find("```") + 3
-        end = response_text.find("```", start)
-        response_text = response_text[start:end].strip()
-
-    # Find JSON object boundaries
-    if "{" in response_text:
-        start = response_text.find("{")
-        end = response_text.rfind("}") + 1
-        response_text = response_text[start:end]
-
-    data = json.loads(response_text)
+    data = _load_json_response(response_text)
 
     # Extract and normalize genre
     raw_genre = data.get("genre")
     genre = _normalize_genre(raw_genre)
 
-    segments = []
+    return genre, _build_segments(data.get("segments", ()))
+
+
+@lru_cache(maxsize=512)
+def _parse_segments_memo(response_text: str) -> tuple[str, tuple[Segment, ...]]:
+    """_parse_segments_response() memoized on the raw response text."""
+    genre, segments = _parse_segments_response(response_text)
+    return genre, tuple(segments)
 
-    for seg in data.get("segments", []):
-        segments.append(Segment(
-            start_line=int(seg["start_line"]),
-            end_line=int(seg["end_line"]),
-            lyrics=seg["lyrics"],
-            ai_description=seg["ai_description"],
-            primary_emotion=seg["primary_emotion"],
-            secondary_emotion=seg.get("secondary_emotion"),
-            energy=seg["energy"],
-            tone=seg["tone"],
-        ))
 
-    return genre, segments
+def _parse_segments_cached(response_text: str) -> tuple[str, list[Segment]]:
+    """
+    Parse a response, reusing the result for identical response text.
+
+    Segments are frozen, so the memoized instances are shared directly.
+    """
+    genre, segments = _parse_segments_memo(response_text)
+    return genre, list(segments)
 
 
 def _parse_batched_response(
@@ -327,26 +449,7 @@ def _parse_batched_response(
     Returns:
         List of BatchedSongResult, one per expected song
     """
-    # Extract JSON from response
-    response_text = response_text.strip()
-
-    # Handle markdown code blocks
-    if "```json" in response_text:
-        start = response_text.find("```json") + 7
-        end = response_text.find("```", start)
-        response_text = response_text[start:end].strip()
-    elif "```" in response_text:
-        start = response_text.find("```") + 3
-        end = response_text.find("```", start)
-        response_text = response_text[start:end].strip()
-
-    # Find JSON object boundaries
-    if "{" in response_text:
-        start = response_text.find("{")
-        end = response_text.rfind("}") + 1
-        response_text = response_text[start:end]
-
-    data = json.loads(response_text)
+    data = _load_json_response(response_text)
     songs_data = data.get("songs", [])
 
     # Build lookup by song_index
@@ -390,18 +493,7 @@ def _parse_batched_response(
 
         # Parse segments
         try:
-            segments = []
-            for seg in song_data.get("segments", []):
-                segments.append(Segment(
-                    start_line=int(seg["start_line"]),
-                    end_line=int(seg["end_line"]),
-                    lyrics=seg["lyrics"],
-                    ai_description=seg["ai_description"],
-                    primary_emotion=seg["primary_emotion"],
-                    secondary_emotion=seg.get("secondary_emotion"),
-                    energy=seg["energy"],
-                    tone=seg["tone"],
-                ))
+            segments = _build_segments(song_data.get("segments", ()))
 
             results.append(BatchedSongResult(
                 track_id=track_id,
@@ -425,20 +517,138 @@ def _parse_batched_response(
     return results
 
 
+# Provider clients, reused so calls share one HTTP connection pool (and TLS
+# session). Each is tied to the event loop it was created on.
+_clients: dict[str, tuple[asyncio.AbstractEventLoop, Any]] = {}
+
+# Fail fast on connect; large batched completions can take a while to stream
+_LLM_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+
+def _get_client(provider: str) -> Any:
+    """
+    Get the shared async client for a provider, creating it on first use.
+
+    A new client is created if the running event loop changed (e.g. a
+    second asyncio.run()), since pooled connections can't cross loops.
+
+    Raises:
+        MissingAPIKeyError: If the provider's API key is not set
+    """
+    loop = asyncio.get_running_loop()
+    cached = _clients.get(provider)
+    if cached is not None and cached[0] is loop:
+        return cached[1]
+
+    api_key = get_api_key(provider)
+
+    if provider == "groq":
+        from groq import AsyncGroq
+
+        # Retries are handled by the callers (rate limits are surfaced, not
+        # slept through), so the SDK's own retry loop is disabled
+        client: Any = AsyncGroq(api_key=api_key, max_retries=0, timeout=_LLM_TIMEOUT)
+    else:
+        from together import AsyncTogether
+
+        client = AsyncTogether(api_key=api_key)
+
+    _clients[provider] = (loop, client)
+    return client
+
+
+async def close_clients() -> None:
+    """Close the shared LLM clients created on the running event loop."""
+    loop = asyncio.get_running_loop()
+
+    for provider, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            del _clients[provider]
+            # AsyncGroq.close() is a coroutine; other SDKs may close synchronously
+            close = getattr(client, "close", None)
+            result = close() if close is not None else None
+            if asyncio.iscoroutine(result):
+                await result
+
+
+def _retry_delay(attempt: int) -> float:
+    """
+    Backoff before retrying a failed LLM call: exponential with full jitter.
+
+    Randomizing over the whole window keeps concurrent workers that failed
+    together from retrying in lockstep.
+
+    Args:
+        attempt: Zero-based attempt that just failed
+
+    Returns:
+        Seconds to sleep
+    """
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_DELAY * 2 ** attempt))
+
+
+def _is_transient(error: Exception) -> bool:
+    """
+    Whether a failed LLM call is worth retrying unchanged.
+
+    Only network errors, timeouts, 5xx responses and unparseable JSON are.
+    Missing keys, auth failures, 4xx requests and parse bugs fail the same
+    way every time.
+    """
+    if isinstance(error, (json.JSONDecodeError, httpx.TransportError, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(error, GroqConnectionError):  # Includes APITimeoutError
+        return True
+    if isinstance(error, GroqStatusError):
+        return error.status_code >= 500
+
+    from together.error import APIConnectionError, ServiceUnavailableError, Timeout
+
+    if isinstance(error, (APIConnectionError, ServiceUnavailableError, Timeout)):
+        return True
+    status = getattr(error, "http_status", None)
+    return isinstance(status, int) and status >= 500
+
+
+def _describe_error(provider: str, error: Exception) -> str:
+    """Error message for a failed provider call."""
+    if isinstance(error, json.JSONDecodeError):
+        return f"JSON parse error: {error}"
+    if isinstance(error, MissingAPIKeyError):
+        return str(error)
+    return f"{provider} error: {error}"
+
+
+def _retry_after_seconds(error: GroqRateLimitError) -> float:
+    """Wait Groq asks for in its rate-limit headers (60s if absent)."""
+    retry_after_ms = error.response.headers.get("retry-after-ms")
+    if retry_after_ms:
+        return float(retry_after_ms) / 1000
+
+    retry_after = error.response.headers.get("retry-after")
+    return float(retry_after) if retry_after else 60.0
+
+
+def _rate_limited_result(provider: str, error: GroqRateLimitError) -> SegmentationResult:
+    """Unsuccessful SegmentationResult carrying the provider's retry-after."""
+    return SegmentationResult(
+        success=False,
+        segments=[],
+        genre=None,
+        provider=provider,
+        error=f"Rate limited by {provider}",
+        retry_after_seconds=_retry_after_seconds(error),
+    )
+
+
 async def _call_groq(prompt: str, max_tokens: int = 2000) -> str:
     """Call Groq API for segmentation (async)."""
-    from groq import AsyncGroq
-
-    api_key = get_api_key("groq")
-    client = AsyncGroq(api_key=api_key)
+    client = _get_client("groq")
 
     response = await client.chat.completions.create(
         model=LLM_MODEL_GROQ,
         messages=[
-            {
-                "role": "system",
-                "content": "You are a music analysis expert. Output only valid JSON.",
-            },
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         temperature=0.3,
@@ -453,18 +663,12 @@ async def _call_groq(prompt: str, max_tokens: int = 2000) -> str:
 
 async def _call_together(prompt: str, max_tokens: int = 2000) -> str:
     """Call Together.ai API for segmentation (async)."""
-    from together import AsyncTogether
-
-    api_key = get_api_key("together")
-    client = AsyncTogether(api_key=api_key)
+    client = _get_client("together")
 
     response = await client.chat.completions.create(
         model=LLM_MODEL_TOGETHER,
         messages=[
-            {
-                "role": "system",
-                "content": "You are a music analysis expert. Output only valid JSON.",
-            },
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         temperature=0.3,
@@ -482,88 +686,191 @@ async def _call_together(prompt: str, max_tokens: int = 2000) -> str:
     return content # type: ignore
 
 
+async def _call_provider(provider: str, prompt: str, max_tokens: int = 2000) -> str:
+    """Call a provider by name."""
+    if provider == "groq":
+        return await _call_groq(prompt, max_tokens=max_tokens)
+    if provider == "together":
+        return await _call_together(prompt, max_tokens=max_tokens)
+    raise ValueError(f"Unknown provider: {provider}")
+
+
+async def _race_providers(
+    prompt: str,
+    providers: list[str],
+) -> tuple[SegmentationResult | None, dict[str, Exception | None]]:
+    """
+    Hedge the prompt across providers; keep the first usable answer.
+
+    Providers are started in order, each one LLM_HEDGE_DELAY after the
+    previous unless an earlier request has already failed, so a fast
+    primary answers alone and only slow calls pay for a second request.
+    Losing requests are cancelled.
+
+    Returns:
+        (result, failures). result is the first successful answer; failing
+        that, a rate-limited result if any provider was rate limited; else
+        None. failures maps each provider whose raced call failed to its
+        error (call or parse; None when it answered without segments), so
+        the caller's retry ladder counts that call as an attempt.
+    """
+    tasks: dict[asyncio.Task[str], str] = {}
+    pending: set[asyncio.Task[str]] = set()
+    waiting = list(providers)
+    failures: dict[str, Exception | None] = {}
+    rate_limited: SegmentationResult | None = None
+
+    try:
+        while waiting or pending:
+            if waiting:
+                provider = waiting.pop(0)
+                task = asyncio.create_task(_call_provider(provider, prompt))
+                tasks[task] = provider
+                pending.add(task)
+
+            # Head start for the requests in flight before hedging with the next
+            timeout = LLM_HEDGE_DELAY if waiting else None
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                provider = tasks[task]
+                error = task.exception()
+                if isinstance(error, Exception):
+                    failures[provider] = error
+                    if isinstance(error, GroqRateLimitError):
+                        rate_limited = _rate_limited_result(provider, error)
+                    continue
+
+                try:
+                    genre, segments = _parse_segments_cached(task.result())
+                except Exception as e:
+                    failures[provider] = e
+                    continue
+
+                if segments:
+                    return SegmentationResult(
+                        success=True,
+                        segments=segments,
+                        genre=genre,
+                        provider=provider,
+                    ), failures
+                failures[provider] = None
+    finally:
+        for task in pending:
+            task.cancel()
+
+    return rate_limited, failures
+
+
 async def segment_lyrics(
     lyrics: str,
     title: str,
     artist: str,
-    providers: Optional[list[str]] = None,
+    providers: list[str] | None = None,
+    use_cache: bool = True,
 ) -> SegmentationResult:
     """
     Analyze lyrics and identify meaningful segments using LLM.
 
+    Successful results are cached on disk by (artist, title, lyrics), so
+    segmenting the same song again skips the LLM call.
+
     Args:
         lyrics: Plain lyrics text (without timestamps)
         title: Song title
         artist: Artist name
         providers: List of providers to try in order (defaults to config)
+        use_cache: Read and write the segmentation cache
 
     Returns:
         SegmentationResult with identified segments
     """
+    if not use_cache:
+        return await _segment_lyrics_uncached(lyrics, title, artist, providers)
+
+    key = segmentation_cache.make_key(artist, title, lyrics)
+    cached = await asyncio.to_thread(segmentation_cache.get, key)
+    if cached is not None:
+        return SegmentationResult(
+            success=True,
+            segments=[Segment(**seg) for seg in cached["segments"]],
+            genre=cached["genre"],
+            provider=cached["provider"],
+        )
+
+    result = await _segment_lyrics_uncached(lyrics, title, artist, providers)
+
+    if result.success:
+        await asyncio.to_thread(segmentation_cache.put, key, {
+            "genre": result.genre,
+            "provider": result.provider,
+            "segments": [seg.to_dict() for seg in result.segments],
+        })
+
+    return result
+
+
+async def _segment_lyrics_uncached(
+    lyrics: str,
+    title: str,
+    artist: str,
+    providers: list[str] | None,
+) -> SegmentationResult:
+    """segment_lyrics() without the cache: race, then the retry ladder."""
     providers_list: list[str] = providers if providers else LLM_PROVIDERS
 
-    # Build prompt
-    numbered_lyrics = _create_numbered_lyrics(lyrics)
-    prompt = SEGMENTATION_PROMPT.format(
-        title=title,
-        artist=artist,
-        numbered_lyrics=numbered_lyrics,
-    )
+    prompt = _build_prompt(title, artist, lyrics)
 
-    last_error: Optional[str] = None
+    last_error: str | None = None
+    raced: dict[str, Exception | None] = {}
+
+    # Latency is dominated by the LLM round-trip: with several providers,
+    # ask them all at once before falling back to one-by-one retries
+    if LLM_RACE_PROVIDERS and len(providers_list) > 1:
+        result, raced = await _race_providers(prompt, providers_list)
+        if result is not None:
+            # Success, or rate limited - don't ask the limited provider again now
+            return result
 
     for provider in providers_list:
-        for attempt in range(MAX_RETRIES):
-            try:
-                # Call appropriate provider
-                if provider == "groq":
-                    response_text = await _call_groq(prompt)
-                elif provider == "together":
-                    response_text = await _call_together(prompt)
-                else:
+        first_attempt = 0
+        if provider in raced:
+            # The raced call was this provider's first attempt
+            error = raced[provider]
+            if error is None:
+                last_error = f"{provider} returned no segments"
+            else:
+                last_error = _describe_error(provider, error)
+                if not _is_transient(error):
                     continue
+            first_attempt = 1
 
-                # Parse response
-                genre, segments = _parse_segments_response(response_text)
+        for attempt in range(first_attempt, MAX_RETRIES):
+            if attempt:
+                await asyncio.sleep(_retry_delay(attempt - 1))
 
-                if segments:
-                    return SegmentationResult(
-                        success=True,
-                        segments=segments,
-                        genre=genre,
-                        provider=provider,
-                    )
-
-            except json.JSONDecodeError as e:
-                last_error = f"JSON parse error: {e}"
-            except ValueError as e:
-                # API key not set - skip this provider
-                last_error = str(e)
-                break  # Don't retry, move to next provider
+            try:
+                response_text = await _call_provider(provider, prompt)
+                genre, segments = _parse_segments_cached(response_text)
             except GroqRateLimitError as e:
-                # Use exact retry-after time from Groq headers
-                retry_after_ms = e.response.headers.get("retry-after-ms")
-                if retry_after_ms:
-                    wait_time = float(retry_after_ms) / 1000
-                else:
-                    retry_after = e.response.headers.get("retry-after")
-                    wait_time = float(retry_after) if retry_after else 60.0
-
                 # Return immediately with retry info (don't block waiting)
+                return _rate_limited_result(provider, e)
+            except Exception as e:
+                last_error = _describe_error(provider, e)
+                if _is_transient(e):
+                    continue
+                break  # Retrying won't help - move to next provider
+
+            if segments:
                 return SegmentationResult(
-                    success=False,
-                    segments=[],
-                    genre=None,
+                    success=True,
+                    segments=segments,
+                    genre=genre,
                     provider=provider,
-                    error=f"Rate limited by {provider}",
-                    retry_after_seconds=wait_time,
                 )
-            except Exception as e:
-                last_error = f"{provider} error: {e}"
-
-            # Wait before retry (for non-rate-limit errors)
-            if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+            last_error = f"{provider} returned no segments"
 
     return SegmentationResult(
         success=False,
@@ -574,9 +881,208 @@ async def segment_lyrics(
     )
 
 
+def _batch_api_song_result(
+    item: dict[str, Any] | None,
+    song_index: int,
+    title: str,
+    artist: str,
+    track_id: int,
+) -> BatchedSongResult:
+    """Turn one line of a Batch API output file into a BatchedSongResult."""
+    result = BatchedSongResult(
+        track_id=track_id,
+        song_index=song_index,
+        title=title,
+        artist=artist,
+        genre=None,
+        segments=[],
+    )
+
+    if item is None:
+        result.error = "Not returned in batch output"
+        return result
+
+    response = item.get("response") or {}
+    if response.get("status_code") != 200:
+        error = item.get("error")
+        if isinstance(error, dict):
+            error = error.get("message")
+        result.error = f"Batch request failed: {error or response.get('status_code')}"
+        return result
+
+    try:
+        content = response["body"]["choices"][0]["message"]["content"]
+        result.genre, result.segments = _parse_segments_response(content)
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        result.error = f"Parse error: {e}"
+
+    return result
+
+
+async def segment_lyrics_batch_api(
+    songs: list[tuple[str, str, str, int]],
+) -> BatchSegmentationResult:
+    """
+    Segment songs through Groq's Batch API.
+
+    Each song becomes one single-song chat completion in an uploaded JSONL
+    file. The job is polled until it finishes; if it hasn't finished within
+    LLM_BATCH_API_MAX_WAIT it is cancelled and an unsuccessful result is
+    returned so the caller can fall back to an inline request.
+
+    Args:
+        songs: List of (lyrics, title, artist, track_id) tuples
+
+    Returns:
+        BatchSegmentationResult with results for each song
+
+    Raises:
+        MissingAPIKeyError: If the Groq API key is not set
+    """
+    client = _get_client("groq")
+
+    requests = b"\n".join(
+        orjson.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": LLM_MODEL_GROQ,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": _build_prompt(title, artist, lyrics)},
+                ],
+                "temperature": 0.3,
+                "max_tokens": 2000,
+            },
+        })
+        for i, (lyrics, title, artist, _track_id) in enumerate(songs, 1)
+    )
+
+    input_file = await client.files.create(
+        file=("segmentation_batch.jsonl", requests),
+        purpose="batch",
+    )
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=LLM_BATCH_API_WINDOW,
+    )
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + LLM_BATCH_API_MAX_WAIT
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        if loop.time() >= deadline:
+            await client.batches.cancel(batch.id)
+            return BatchSegmentationResult(
+                success=False,
+                song_results=[],
+                provider="groq",
+                error=f"Batch job not finished after {LLM_BATCH_API_MAX_WAIT:.0f}s",
+            )
+        await asyncio.sleep(LLM_BATCH_API_POLL_INTERVAL)
+        batch = await client.batches.retrieve(batch.id)
+
+    if batch.status != "completed" or not batch.output_file_id:
+        return BatchSegmentationResult(
+            success=False,
+            song_results=[],
+            provider="groq",
+            error=f"Batch job {batch.status}",
+        )
+
+    output = await client.files.content(batch.output_file_id)
+    items = {}
+    for line in (await output.read()).splitlines():
+        if line.strip():
+            item = orjson.loads(line)
+            items[item.get("custom_id")] = item
+
+    song_results = [
+        _batch_api_song_result(items.get(str(i)), i, title, artist, track_id)
+        for i, (_, title, artist, track_id) in enumerate(songs, 1)
+    ]
+
+    return BatchSegmentationResult(
+        success=any(r.segments for r in song_results),
+        song_results=song_results,
+        provider="groq",
+    )
+
+
+def _failed_song_results(
+    songs: list[tuple[str, str, str, int]],
+    start: int,
+    error: str,
+) -> list[BatchedSongResult]:
+    """One failed BatchedSongResult per song, numbered from start + 1."""
+    return [
+        BatchedSongResult(
+            track_id=track_id,
+            song_index=index,
+            title=title,
+            artist=artist,
+            genre=None,
+            segments=[],
+            error=error,
+        )
+        for index, (_, title, artist, track_id) in enumerate(songs, start + 1)
+    ]
+
+
+def _merge_batch_results(
+    songs: list[tuple[str, str, str, int]],
+    half: int,
+    first: BatchSegmentationResult,
+    second: BatchSegmentationResult,
+) -> BatchSegmentationResult:
+    """
+    Combine the results of a batch that was split in two halves.
+
+    A half that failed outright (no song results) is reported as one failed
+    result per track, so callers see exactly which tracks are missing.
+
+    Args:
+        songs: The full batch that was split
+        half: Split point - first covers songs[:half], second songs[half:]
+        first: Result for songs[:half]
+        second: Result for songs[half:]
+
+    Returns:
+        Merged BatchSegmentationResult. Only retryable (retry_after_seconds
+        set) when neither half succeeded.
+    """
+    song_results: list[BatchedSongResult] = []
+    for result, part, start in ((first, songs[:half], 0), (second, songs[half:], half)):
+        if result.success or result.song_results:
+            song_results.extend(
+                replace(r, song_index=r.song_index + start) for r in result.song_results
+            )
+        else:
+            song_results.extend(
+                _failed_song_results(part, start, result.error or "Batch segmentation failed")
+            )
+
+    success = first.success or second.success
+    errors = [r.error for r in (first, second) if r.error]
+    retry_afters = [
+        r.retry_after_seconds for r in (first, second) if r.retry_after_seconds is not None
+    ]
+
+    return BatchSegmentationResult(
+        success=success,
+        song_results=song_results,
+        provider=first.provider or second.provider,
+        error="; ".join(errors) if errors else None,
+        retry_after_seconds=max(retry_afters) if retry_afters and not success else None,
+    )
+
+
 async def segment_lyrics_batch(
     songs: list[tuple[str, str, str, int]],
-    providers: Optional[list[str]] = None,
+    providers: list[str] | None = None,
+    use_batch_api: bool = LLM_USE_BATCH_API,
 ) -> BatchSegmentationResult:
     """
     Analyze multiple songs' lyrics in a single LLM call.
@@ -584,6 +1090,8 @@ async def segment_lyrics_batch(
     Args:
         songs: List of (lyrics, title, artist, track_id) tuples
         providers: List of providers to try in order (defaults to config)
+        use_batch_api: Try Groq's Batch API first, falling back to the
+            inline batched prompt if the job fails or times out
 
     Returns:
         BatchSegmentationResult with results for each song
@@ -597,68 +1105,76 @@ async def segment_lyrics_batch(
 
     providers_list: list[str] = providers if providers else LLM_PROVIDERS
 
+    if use_batch_api and "groq" in providers_list:
+        try:
+            batch_api_result = await segment_lyrics_batch_api(songs)
+            if batch_api_result.success:
+                return batch_api_result
+        except Exception:
+            pass  # Fall back to the inline batched prompt
+
     # Build batched prompt
     prompt = _build_batched_prompt(songs)
 
     # Track expected songs for matching (title, artist, track_id)
     expected_songs = [(title, artist, track_id) for (_, title, artist, track_id) in songs]
 
-    # Calculate max_tokens based on batch size (roughly 1500 tokens per song)
-    max_tokens = min(15000, len(songs) * 1500)
+    # Size the response from the actual prompt: room for every song's
+    # segments, within what's left of the context window
+    prompt_tokens = estimate_tokens(prompt)
+    response_budget = len(songs) * LLM_RESPONSE_TOKENS_PER_SONG
+
+    if len(songs) > 1 and prompt_tokens + response_budget > LLM_CONTEXT_TOKENS:
+        # Too big for one call (and accuracy drops on huge batches): split
+        half = len(songs) // 2
+        first, second = await asyncio.gather(
+            segment_lyrics_batch(songs[:half], providers, use_batch_api=False),
+            segment_lyrics_batch(songs[half:], providers, use_batch_api=False),
+        )
+        return _merge_batch_results(songs, half, first, second)
+
+    max_tokens = max(
+        400,
+        min(LLM_MAX_RESPONSE_TOKENS, response_budget, LLM_CONTEXT_TOKENS - prompt_tokens - 256),
+    )
 
-    last_error: Optional[str] = None
+    last_error: str | None = None
 
     for provider in providers_list:
         for attempt in range(MAX_RETRIES):
-            try:
-                # Call appropriate provider
-                if provider == "groq":
-                    response_text = await _call_groq(prompt, max_tokens=max_tokens)
-                elif provider == "together":
-                    response_text = await _call_together(prompt, max_tokens=max_tokens)
-                else:
-                    continue
-                # Parse batched response
-                song_results = _parse_batched_response(response_text, expected_songs)
+            if attempt:
+                await asyncio.sleep(_retry_delay(attempt - 1))
 
-                # Check if at least some songs succeeded
-                success_count = sum(1 for r in song_results if r.segments)
-                if success_count > 0:
-                    return BatchSegmentationResult(
-                        success=True,
-                        song_results=song_results,
-                        provider=provider,
-                    )
-
-            except json.JSONDecodeError as e:
-                last_error = f"JSON parse error: {e}"
-            except ValueError as e:
-                # API key not set - skip this provider
-                last_error = str(e)
-                break  # Don't retry, move to next provider
+            try:
+                response_text = await _call_provider(provider, prompt, max_tokens=max_tokens)
+                # Parse batched response off the event loop - a full batch
+                # can be tens of KB of JSON
+                song_results = await asyncio.to_thread(
+                    _parse_batched_response, response_text, expected_songs
+                )
             except GroqRateLimitError as e:
-                # Use exact retry-after time from Groq headers
-                retry_after_ms = e.response.headers.get("retry-after-ms")
-                if retry_after_ms:
-                    wait_time = float(retry_after_ms) / 1000
-                else:
-                    retry_after = e.response.headers.get("retry-after")
-                    wait_time = float(retry_after) if retry_after else 60.0
-
                 # Return immediately with retry info (don't block waiting)
                 return BatchSegmentationResult(
                     success=False,
                     song_results=[],
                     provider=provider,
                     error=f"Rate limited by {provider}",
-                    retry_after_seconds=wait_time,
+                    retry_after_seconds=_retry_after_seconds(e),
                 )
             except Exception as e:
-                last_error = f"{provider} error: {e}"
+                last_error = _describe_error(provider, e)
+                if _is_transient(e):
+                    continue
+                break  # Retrying won't help - move to next provider
 
-            # Wait before retry (for non-rate-limit errors)
-            if attempt < MAX_RETRIES - 1:
-                await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+            # Check if at least some songs succeeded
+            if any(r.segments for r in song_results):
+                return BatchSegmentationResult(
+                    success=True,
+                    song_results=song_results,
+                    provider=provider,
+                )
+            last_error = f"{provider} returned no segments"
 
     # All providers failed - return error for all songs
     return BatchSegmentationResult(
@@ -687,6 +1203,9 @@ def validate_segments(
     """
     Validate and filter segments.
 
+    Single-song form of validate_segments_batch(), which checks line ranges
+    with numpy.
+
     Args:
         segments: List of segments from LLM
         total_lines: Total number of lines in lyrics
@@ -694,36 +1213,80 @@ def validate_segments(
     Returns:
         Tuple of (valid_segments, error_messages)
     """
-    valid = []
-    errors = []
+    return validate_segments_batch([segments], [total_lines])[0]
 
-    for i, seg in enumerate(segments):
-        # Check line numbers are valid
-        if seg.start_line < 1:
-            errors.append(f"Segment {i}: start_line < 1")
-            continue
 
-        if seg.end_line < seg.start_line:
-            errors.append(f"Segment {i}: end_line < start_line")
-            continue
+def validate_segments_batch(
+    all_segments: list[list[Segment]],
+    total_lines: list[int],
+) -> list[tuple[list[Segment], list[str]]]:
+    """
+    Validate and filter segments for many songs at once.
 
-        if seg.end_line > total_lines:
-            errors.append(f"Segment {i}: end_line > total_lines ({total_lines})")
-            continue
+    Line ranges for every segment in the batch are checked in one
+    vectorized pass; the string checks run per segment. An unknown energy
+    level is replaced with "medium".
 
-        # Check required fields
-        if not seg.ai_description:
-            errors.append(f"Segment {i}: missing ai_description")
-            continue
+    Args:
+        all_segments: Segments from the LLM, one list per song
+        total_lines: Total number of lyric lines, one per song
 
-        if not seg.primary_emotion:
-            errors.append(f"Segment {i}: missing primary_emotion")
-            continue
+    Returns:
+        One (valid_segments, error_messages) tuple per song, in input order
+    """
+    counts = [len(segments) for segments in all_segments]
+    flat = [seg for segments in all_segments for seg in segments]
+    n = len(flat)
+
+    starts = np.fromiter((seg.start_line for seg in flat), dtype=np.int64, count=n)
+    ends = np.fromiter((seg.end_line for seg in flat), dtype=np.int64, count=n)
+    limits = np.repeat(np.asarray(total_lines, dtype=np.int64), counts)
+
+    bad_start = starts < 1
+    bad_order = ~bad_start & (ends < starts)
+    bad_end = ~bad_start & ~bad_order & (ends > limits)
+    range_ok = ~(bad_start | bad_order | bad_end)
+
+    # Python bools index faster than numpy scalars in the loop below
+    bad_start_list = bad_start.tolist()
+    bad_order_list = bad_order.tolist()
+    range_ok_list = range_ok.tolist()
+
+    results: list[tuple[list[Segment], list[str]]] = []
+    k = 0
+
+    for segments, song_lines in zip(all_segments, total_lines):
+        valid = []
+        errors = []
+
+        for i, seg in enumerate(segments):
+            ok = range_ok_list[k]
+            start_bad = bad_start_list[k]
+            order_bad = bad_order_list[k]
+            k += 1
+
+            if not ok:
+                if start_bad:
+                    errors.append(f"Segment {i}: start_line < 1")
+                elif order_bad:
+                    errors.append(f"Segment {i}: end_line < start_line")
+                else:
+                    errors.append(f"Segment {i}: end_line > total_lines ({song_lines})")
+                continue
 
-        # Validate energy level
-        if seg.energy not in ("low", "medium", "high", "very-high"):
-            seg.energy = "medium"  # Default to medium
+            if not seg.ai_description:
+                errors.append(f"Segment {i}: missing ai_description")
+                continue
 
-        valid.append(seg)
+            if not seg.primary_emotion:
+                errors.append(f"Segment {i}: missing primary_emotion")
+                continue
 
-    return valid, errors
+            if seg.energy not in ("low", "medium", "high", "very-high"):
+                seg = replace(seg, energy="medium")
+
+            valid.append(seg)
+
+        results.append((valid, errors))
+
+    return results
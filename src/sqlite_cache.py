@@ -0,0 +1,42 @@
+"""
+Shared SQLite setup for the on-disk caches.
+
+Each cache module (embeddings, LRCLib responses, segmentations) owns one
+CacheDB and keeps only its keys and serialization; opening the file,
+WAL/synchronous pragmas and cross-thread locking live here.
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class CacheDB:
+    """A lazily opened cache database shared by every thread."""
+
+    def __init__(self, path: Path, schema: str) -> None:
+        """
+        Args:
+            path: SQLite file (parent directories are created on first use)
+            schema: CREATE ... IF NOT EXISTS statements run when opened
+        """
+        self.path = path
+        self.schema = schema
+        self.lock = threading.Lock()  # Serializes use of the one connection
+        self._conn: sqlite3.Connection | None = None
+
+    def conn(self) -> sqlite3.Connection:
+        """Lazy open the cache database (caller holds self.lock)."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.schema)
+            self._conn = conn
+
+        return self._conn
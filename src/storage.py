@@ -5,33 +5,76 @@ Handles uploading audio snippets to R2 (S3-compatible).
 All operations are async for efficient network IO.
 """
 
+import asyncio
+import hashlib
 import os
+from contextlib import AsyncExitStack
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any
 
 import aioboto3
-
-
-@dataclass
+import aiofiles
+from aiobotocore.config import AioConfig
+from boto3.s3.transfer import TransferConfig
+
+# Files above the threshold go up as concurrent multipart parts; below it,
+# a single streamed PUT. Either way the file is read in chunks, not at once.
+MULTIPART_THRESHOLD = 5 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+
+_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    use_threads=False,
+)
+
+# Connection pool sized for concurrent segment uploads across track workers;
+# short timeouts so a stalled connection fails over to a retry quickly
+_CLIENT_CONFIG = AioConfig(
+    max_pool_connections=64,
+    connect_timeout=5,
+    read_timeout=30,
+    retries={"mode": "adaptive", "max_attempts": 5},
+    tcp_keepalive=True,
+)
+
+# R2 settings, read from the environment on first successful use
+_r2_config: dict[str, Any] | None = None
+
+# Shared S3 client: (event loop, exit stack holding the client context, client)
+_s3: tuple[asyncio.AbstractEventLoop, AsyncExitStack, Any] | None = None
+_s3_lock: tuple[asyncio.AbstractEventLoop, asyncio.Lock] | None = None
+
+
+@dataclass(slots=True)
 class UploadResult:
     """Result of upload operation."""
 
     success: bool
-    url: Optional[str]  # Public URL to access the file
-    error: Optional[str] = None
+    url: str | None  # Public URL to access the file
+    error: str | None = None
 
 
 def _get_r2_config() -> dict[str, Any]:
     """
     Get R2 configuration from environment variables.
 
+    Read once per process (see reload_r2_config()); a missing variable is
+    reported on every call until it is set.
+
     Returns:
-        Dictionary with endpoint_url, aws_access_key_id, aws_secret_access_key, bucket_name
+        Dictionary with endpoint_url, aws_access_key_id, aws_secret_access_key,
+        bucket_name, public_domain (None if unset)
 
     Raises:
         ValueError: If required environment variables are not set
     """
+    global _r2_config
+
+    if _r2_config is not None:
+        return _r2_config
+
     required = {
         "R2_ENDPOINT": os.environ.get("R2_ENDPOINT"),
         "R2_ACCESS_KEY_ID": os.environ.get("R2_ACCESS_KEY_ID"),
@@ -46,15 +89,24 @@ def _get_r2_config() -> dict[str, Any]:
             "Please add them to your .env file."
         )
 
-    return {
+    _r2_config = {
         "endpoint_url": required["R2_ENDPOINT"],
         "aws_access_key_id": required["R2_ACCESS_KEY_ID"],
         "aws_secret_access_key": required["R2_SECRET_ACCESS_KEY"],
         "bucket_name": required["R2_BUCKET_NAME"],
+        # Optional custom domain for public URLs
+        "public_domain": os.environ.get("R2_PUBLIC_DOMAIN"),
     }
+    return _r2_config
+
+
+def reload_r2_config() -> None:
+    """Forget the cached R2 configuration so the environment is read again."""
+    global _r2_config
+    _r2_config = None
 
 
-def _get_public_url(bucket_name: str, key: str) -> str:
+def _get_public_url(config: dict[str, Any], key: str) -> str:
     """
     Build public URL for an R2 object.
 
@@ -62,7 +114,7 @@ def _get_public_url(bucket_name: str, key: str) -> str:
     or a custom domain configured.
 
     Args:
-        bucket_name: R2 bucket name
+        config: R2 configuration from _get_r2_config()
         key: Object key (path in bucket)
 
     Returns:
@@ -72,13 +124,80 @@ def _get_public_url(bucket_name: str, key: str) -> str:
     # You may need to adjust this based on your R2 configuration
     # Option 1: R2.dev subdomain (if enabled)
     # Option 2: Custom domain
-    public_domain = os.environ.get("R2_PUBLIC_DOMAIN")
+    public_domain = config["public_domain"]
 
     if public_domain:
         return f"https://{public_domain}/{key}"
 
     # Fallback: Use bucket subdomain (requires public access)
-    return f"https://{bucket_name}.r2.dev/{key}"
+    return f"https://{config['bucket_name']}.r2.dev/{key}"
+
+
+async def _get_s3_client(config: dict[str, Any]) -> Any:
+    """
+    Get the shared S3 client, creating it on first use.
+
+    Building a botocore client (service model, endpoint, TLS handshake) per
+    upload dominated upload latency; one client keeps its connection pool
+    warm across uploads. A new client is created if the running event loop
+    changed (e.g. a second asyncio.run()), since connections can't cross loops.
+
+    Args:
+        config: R2 configuration from _get_r2_config()
+
+    Returns:
+        aioboto3 S3 client (do not close; see close_s3())
+    """
+    global _s3, _s3_lock
+
+    loop = asyncio.get_running_loop()
+    if _s3 is not None and _s3[0] is loop:
+        return _s3[2]
+
+    if _s3_lock is None or _s3_lock[0] is not loop:
+        _s3_lock = (loop, asyncio.Lock())
+
+    async with _s3_lock[1]:
+        if _s3 is not None and _s3[0] is loop:
+            return _s3[2]
+
+        stack = AsyncExitStack()
+        # aioboto3 returns async context manager (Pylance lacks type stubs)
+        client = await stack.enter_async_context(
+            aioboto3.Session().client(  # type: ignore[reportGeneralTypeIssues]
+                "s3",
+                endpoint_url=config["endpoint_url"],
+                aws_access_key_id=config["aws_access_key_id"],
+                aws_secret_access_key=config["aws_secret_access_key"],
+                config=_CLIENT_CONFIG,
+            )
+        )
+        _s3 = (loop, stack, client)
+        return client
+
+
+async def close_s3() -> None:
+    """Close the shared S3 client, if one is open on the running event loop."""
+    global _s3
+
+    if _s3 is not None and _s3[0] is asyncio.get_running_loop():
+        stack = _s3[1]
+        _s3 = None
+        await stack.aclose()
+
+
+def _file_digest(file_path: Path) -> str:
+    """
+    BLAKE2b digest of a file, read in chunks.
+
+    Args:
+        file_path: Local path to the file
+
+    Returns:
+        Hex digest (128-bit)
+    """
+    with open(file_path, "rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
 
 
 async def upload_snippet(
@@ -107,26 +226,24 @@ async def upload_snippet(
     key = f"snippets/{snippet_id}{extension}"
 
     try:
-        session = aioboto3.Session()
-
-        # aioboto3 returns async context manager (Pylance lacks type stubs)
-        async with session.client(  # type: ignore[reportGeneralTypeIssues]
-            "s3",
-            endpoint_url=config["endpoint_url"],
-            aws_access_key_id=config["aws_access_key_id"],
-            aws_secret_access_key=config["aws_secret_access_key"],
-        ) as s3:
-            # Upload file
-            with open(file_path, "rb") as f:
-                await s3.put_object(
-                    Bucket=config["bucket_name"],
-                    Key=key,
-                    Body=f.read(),
-                    ContentType=content_type,
-                )
+        s3 = await _get_s3_client(config)
+
+        # Content hash stored with the object so re-uploads and downstream
+        # readers can verify it (the transfer itself is CRC32-checked by R2)
+        digest = await asyncio.to_thread(_file_digest, file_path)
+
+        # Stream from disk without blocking the event loop on the read
+        async with aiofiles.open(file_path, "rb") as f:
+            await s3.upload_fileobj(
+                f,
+                config["bucket_name"],
+                key,
+                ExtraArgs={"ContentType": content_type, "Metadata": {"blake2b": digest}},
+                Config=_TRANSFER_CONFIG,
+            )
 
         # Build public URL
-        public_url = _get_public_url(config["bucket_name"], key)
+        public_url = _get_public_url(config, key)
 
         return UploadResult(
             success=True,
@@ -147,6 +264,30 @@ async def upload_snippet(
         )
 
 
+async def upload_snippets_batch(
+    items: list[tuple[Path, str, str]],
+    max_concurrency: int = 16,
+) -> list[UploadResult]:
+    """
+    Upload many snippets concurrently over the shared S3 client.
+
+    Args:
+        items: (file_path, snippet_id, content_type) tuples
+        max_concurrency: Maximum uploads in flight at once
+
+    Returns:
+        List of UploadResult in same order as input
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _upload_one(item: tuple[Path, str, str]) -> UploadResult:
+        async with semaphore:
+            return await upload_snippet(*item)
+
+    # upload_snippet() reports failures in its result, so gather never raises
+    return await asyncio.gather(*[_upload_one(item) for item in items])
+
+
 async def delete_snippet(snippet_id: str, extension: str = ".opus") -> bool:
     """
     Delete a snippet from R2.
@@ -166,19 +307,12 @@ async def delete_snippet(snippet_id: str, extension: str = ".opus") -> bool:
     key = f"snippets/{snippet_id}{extension}"
 
     try:
-        session = aioboto3.Session()
-
-        async with session.client(  # type: ignore[reportGeneralTypeIssues]
-            "s3",
-            endpoint_url=config["endpoint_url"],
-            aws_access_key_id=config["aws_access_key_id"],
-            aws_secret_access_key=config["aws_secret_access_key"],
-        ) as s3:
-            await s3.delete_object(
-                Bucket=config["bucket_name"],
-                Key=key,
-            )
-            return True
+        s3 = await _get_s3_client(config)
+        await s3.delete_object(
+            Bucket=config["bucket_name"],
+            Key=key,
+        )
+        return True
 
     except Exception:
         return False
@@ -191,10 +325,8 @@ def is_r2_configured() -> bool:
     Returns:
         True if all required R2 environment variables are set
     """
-    required = [
-        "R2_ENDPOINT",
-        "R2_ACCESS_KEY_ID",
-        "R2_SECRET_ACCESS_KEY",
-        "R2_BUCKET_NAME",
-    ]
-    return all(os.environ.get(var) for var in required)
+    try:
+        _get_r2_config()
+    except ValueError:
+        return False
+    return True